@@ -0,0 +1,264 @@
+"""Generador de un corpus sintético de facturas para los benchmarks.
+
+Crea, sin conexión y de forma reproducible (semilla fija), facturas PDF al
+estilo chileno con el bloque "SEÑOR(ES):", R.U.T., GIRO, DIRECCION, COMUNA,
+CIUDAD, CONTACTO y F:, seguidas de una tabla de detalle de largo variable.
+Junto a los PDFs se guarda `ground_truth.json` con los datos que debería
+extraer `extract_data_from_text`, y se pueden generar archivos
+clientes.xlsx con miles de filas para medir la verificación de duplicados.
+
+Los PDFs se escriben directamente (texto en Helvetica con WinAnsiEncoding),
+así que no hace falta ninguna biblioteca adicional.
+
+Uso:
+
+    python bench/corpus.py bench/corpus --files 200 --workbooks 1000,10000,100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook  # noqa: E402
+
+from lector_facturas.storage import FIELDS  # noqa: E402
+
+GROUND_TRUTH_NAME = "ground_truth.json"
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINE_HEIGHT = 13
+
+# Dos plantillas de emisor, como las de los ERP más comunes entre los proveedores
+TEMPLATES = (
+    {
+        "name": "erp_a",
+        "producer": "ERP Facturador A 4.2",
+        "issuer": "DISTRIBUIDORA DEL PACIFICO SPA",
+        "issuer_rut": "76.543.210-3",
+        "x": 40,
+        "label_gap": "",
+    },
+    {
+        "name": "erp_b",
+        "producer": "Sistema Contable B (PDF Export)",
+        "issuer": "COMERCIAL ANDES LIMITADA",
+        "issuer_rut": "77.888.999-4",
+        "x": 56,
+        "label_gap": " ",
+    },
+)
+
+COMPANY_WORDS = ("AGRICOLA", "COMERCIAL", "INVERSIONES", "TRANSPORTES", "CONSTRUCTORA",
+                 "SERVICIOS", "FERRETERIA", "PANADERIA", "FARMACIA", "IMPORTADORA")
+COMPANY_SUFFIXES = ("SPA", "LIMITADA", "S.A.", "E.I.R.L.")
+GIROS = ("VENTA AL POR MENOR", "TRANSPORTE DE CARGA", "SERVICIOS DE INGENIERIA",
+         "CONSTRUCCION DE OBRAS", "COMERCIO AL POR MAYOR", "ASESORIAS INFORMATICAS")
+STREETS = ("AV. LIBERTADOR B. O'HIGGINS", "LOS CARRERA", "PEDRO DE VALDIVIA", "IRARRAZAVAL",
+           "GRAN AVENIDA", "AV. ALEMANIA", "CALLE LARGA", "AV. COSTANERA")
+COMUNAS = ("PROVIDENCIA", "ÑUÑOA", "LAS CONDES", "MAIPU", "CONCEPCION", "TEMUCO",
+           "VIÑA DEL MAR", "ANTOFAGASTA")
+CIUDADES = ("SANTIAGO", "CONCEPCION", "TEMUCO", "VALPARAISO", "ANTOFAGASTA")
+NAMES = ("JUAN PEREZ", "MARIA GONZALEZ", "PEDRO MUÑOZ", "CAROLINA ROJAS", "DIEGO SOTO",
+         "CAMILA DIAZ", "FRANCISCO CONTRERAS")
+PRODUCTS = ("TORNILLO HEXAGONAL", "CEMENTO 25KG", "CABLE ELECTRICO", "PINTURA LATEX",
+            "TUBO PVC", "PLANCHA OSB", "GUANTES NITRILO", "MALLA ACMA")
+
+
+def rut_check_digit(body):
+    """Dígito verificador (módulo 11) del cuerpo de un RUT"""
+    total = 0
+    factor = 2
+    for digit in reversed(str(body)):
+        total += int(digit) * factor
+        factor = factor + 1 if factor < 7 else 2
+    remainder = 11 - total % 11
+    return {11: "0", 10: "K"}.get(remainder, str(remainder))
+
+
+def random_rut(rng):
+    body = rng.randint(1_000_000, 29_999_999)
+    return f"{body:,}".replace(",", ".") + "-" + rut_check_digit(body)
+
+
+def random_client(rng):
+    phone = "9" + "".join(str(rng.randint(0, 9)) for _ in range(8))
+    return {
+        "Razón social": f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}",
+        "RUT": random_rut(rng),
+        "Giro": rng.choice(GIROS),
+        "Dirección": f"{rng.choice(STREETS)} {rng.randint(1, 9999)}",
+        "Comuna": rng.choice(COMUNAS),
+        "Ciudad": rng.choice(CIUDADES),
+        "Nombre contacto": rng.choice(NAMES),
+        "Teléfono": phone,
+    }
+
+
+def expected_data(client):
+    """Lo que debería devolver extract_data_from_text para el cliente generado"""
+    expected = dict(client)
+    expected["Teléfono"] = f"+569 {client['Teléfono'][1:]}"
+    return expected
+
+
+def _pdf_string(text):
+    encoded = text.encode("cp1252")
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _content_stream(lines, x, top):
+    """Líneas de texto en una columna, de arriba hacia abajo"""
+    parts = [b"BT /F1 9 Tf", f"{LINE_HEIGHT} TL {x} {top} Td".encode("ascii")]
+    for line in lines:
+        parts.append(_pdf_string(line) + b" Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+
+def write_pdf(path, pages, producer):
+    """Escribe un PDF mínimo; cada página es una lista de líneas de texto"""
+    objects = []  # Cuerpos de los objetos, numerados desde 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    info = add(b"<< /Producer " + _pdf_string(producer) + b" >>")
+    page_ids = []
+    for x, top, lines in pages:
+        data = zlib.compress(_content_stream(lines, x, top))
+        content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 %d 0 R >> >> >>"
+            % (pages_obj, PAGE_WIDTH, PAGE_HEIGHT, content, font)))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += (b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(objects) + 1, catalog, info, xref))
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def invoice_pages(rng, template, number, client, detail_rows):
+    """Líneas de cada página de una factura"""
+    gap = template["label_gap"]
+    header = [
+        template["issuer"],
+        f"R.U.T.: {template['issuer_rut']}",
+        f"FACTURA ELECTRONICA N° {number}",
+        "",
+        f"SEÑOR(ES): {client['Razón social']}",
+        f"R.U.T.:{gap} {client['RUT']}",
+        f"GIRO:{gap} {client['Giro']}",
+        f"DIRECCION:{gap} {client['Dirección']}",
+        f"COMUNA {client['Comuna']}",
+        f"CIUDAD:{gap} {client['Ciudad']}",
+        f"CONTACTO:{gap} {client['Nombre contacto']}",
+        f"F:{gap} {client['Teléfono']}",
+        f"FECHA EMISION: {rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-2024",
+        "FORMA DE PAGO: CREDITO 30 DIAS",
+        "",
+        "DETALLE",
+        "CODIGO   DESCRIPCION                     CANT.   PRECIO      TOTAL",
+    ]
+    rows = []
+    for i in range(detail_rows):
+        quantity = rng.randint(1, 50)
+        price = rng.randint(500, 90000)
+        rows.append(f"{rng.randint(10000, 99999)}    {rng.choice(PRODUCTS):<30}  {quantity:>5}  "
+                    f"{price:>9,}  {quantity * price:>11,}".replace(",", "."))
+
+    lines_per_page = (PAGE_HEIGHT - 80) // LINE_HEIGHT
+    first = header + rows[:lines_per_page - len(header)]
+    pages = [(template["x"], PAGE_HEIGHT - 40, first)]
+    rest = rows[lines_per_page - len(header):]
+    for start in range(0, len(rest), lines_per_page):
+        pages.append((template["x"], PAGE_HEIGHT - 40, rest[start:start + lines_per_page]))
+    return pages
+
+
+def generate_corpus(directory, files=200, seed=1234, max_detail_rows=400):
+    """Genera `files` facturas y su ground truth; devuelve el ground truth"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    truth = {}
+    for number in range(1, files + 1):
+        template = TEMPLATES[number % len(TEMPLATES)]
+        client = random_client(rng)
+        # La mayoría de las facturas son cortas, algunas tienen detalles largos
+        detail_rows = rng.choice((5, 10, 20, 40)) if rng.random() < 0.8 else rng.randint(60, max_detail_rows)
+        name = f"factura_{number:05d}.pdf"
+        write_pdf(os.path.join(directory, name),
+                  invoice_pages(rng, template, number, client, detail_rows),
+                  template["producer"])
+        truth[name] = {"plantilla": template["name"], "datos": expected_data(client)}
+    with open(os.path.join(directory, GROUND_TRUTH_NAME), "w", encoding="utf-8") as f:
+        json.dump(truth, f, ensure_ascii=False, indent=1)
+    return truth
+
+
+def load_ground_truth(directory):
+    with open(os.path.join(directory, GROUND_TRUTH_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def workbook_path(directory, rows):
+    return os.path.join(directory, f"clientes_{rows}.xlsx")
+
+
+def generate_workbook(path, rows, known_clients=(), seed=99):
+    """Escribe un clientes.xlsx con `rows` filas que incluye `known_clients`"""
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(FIELDS)
+    known_clients = list(known_clients)[:rows]
+    for client in known_clients:
+        ws.append([client[field] for field in FIELDS])
+    for _ in range(rows - len(known_clients)):
+        client = expected_data(random_client(rng))
+        ws.append([client[field] for field in FIELDS])
+    wb.save(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el corpus sintético de facturas.")
+    parser.add_argument("directory", help="carpeta de salida")
+    parser.add_argument("--files", type=int, default=200, help="cantidad de facturas")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workbooks", default="1000,10000,100000",
+                        help="tamaños de clientes.xlsx a generar, separados por coma ('' = ninguno)")
+    parser.add_argument("--known-ratio", type=float, default=0.8,
+                        help="fracción de clientes del corpus que ya están en los Excel")
+    args = parser.parse_args(argv)
+
+    truth = generate_corpus(args.directory, args.files, args.seed)
+    known = [entry["datos"] for entry in truth.values()]
+    known = known[:int(len(known) * args.known_ratio)]
+    for size in filter(None, args.workbooks.split(",")):
+        generate_workbook(workbook_path(args.directory, int(size)), int(size), known)
+    print(f"Corpus generado en {args.directory}: {len(truth)} facturas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""Benchmarks de la extracción sobre el corpus sintético.
+
+Escenarios:
+
+- accuracy: compara lo extraído de cada PDF con el ground truth del corpus,
+  para que una optimización no rompa la extracción sin que se note. Corre
+  una pasada con la lectura rápida y otras que fuerzan pdfplumber, con y sin
+  plantillas; el comando termina con código 1 si alguna no es exacta.
+- single: tiempos por etapa de cada archivo procesado por separado
+  (texto, campos, verificación de duplicados y guardado en un Excel de 1.000
+  filas), como al usar "Seleccionar PDF" en la interfaz, y cuántos archivos
+  resolvió la lectura rápida y cuántos pdfplumber, con la plantilla reconocida.
+- batch: un lote completo sobre un Excel nuevo.
+- dedupe: el mismo lote contra Excel de 1k/10k/100k filas que ya contienen
+  la mayoría de los clientes.
+
+Cada escenario corre en un proceso aparte para medir su memoria máxima. Por
+defecto se usan los perfiles de `bench/plantillas.json`, que describen las
+dos plantillas del corpus; con `--templates ''` todo pasa por el análisis
+genérico.
+
+Uso:
+
+    python bench/run_bench.py --corpus bench/corpus --files 200 --workers 4
+    python bench/run_bench.py --scenarios accuracy,single --json
+    python bench/run_bench.py --scenarios accuracy --templates ''
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus  # noqa: E402
+from lector_facturas.extractor import InvoiceProcessor, extract_pdf_data  # noqa: E402
+from lector_facturas.metrics import percentile  # noqa: E402
+from lector_facturas.storage import FIELDS, ExcelStorage, RutIndex  # noqa: E402
+from lector_facturas.templates import load_templates  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS = ("accuracy", "single", "batch", "dedupe")
+
+
+def stage_summary(values):
+    return {
+        "n": len(values),
+        "total_s": sum(values),
+        "media_ms": 1000 * sum(values) / len(values) if values else 0.0,
+        "p50_ms": 1000 * percentile(values, 0.50),
+        "p95_ms": 1000 * percentile(values, 0.95),
+    }
+
+
+def peak_rss_mb():
+    """Memoria residente máxima de este proceso y de sus procesos hijos, en MB"""
+    if resource is None:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes en macOS, KB en Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"proceso": own * scale / 2**20, "hijos": children * scale / 2**20}
+
+
+def pdf_files(corpus_dir, limit):
+    names = sorted(corpus.load_ground_truth(corpus_dir))
+    return [os.path.join(corpus_dir, name) for name in names[:limit]]
+
+
+def _accuracy_pass(files, truth, templates, fast_path):
+    field_hits = dict.fromkeys(FIELDS, 0)
+    exact = 0
+    failures = []
+    tiers = {}
+    start = time.perf_counter()
+    for pdf_path in files:
+        expected = truth[os.path.basename(pdf_path)]["datos"]
+        stats = {"etapas": {}}
+        data = (extract_pdf_data(pdf_path, stats=stats, fast_path=fast_path, templates=templates)
+                or dict.fromkeys(FIELDS))
+        tier = f"{stats.get('nivel')}/{stats.get('plantilla') or 'genérica'}"
+        tiers[tier] = tiers.get(tier, 0) + 1
+        for field in FIELDS:
+            field_hits[field] += data[field] == expected[field]
+        if data == expected:
+            exact += 1
+        elif len(failures) < 5:
+            failures.append({"archivo": os.path.basename(pdf_path),
+                             "campos": [f for f in FIELDS if data[f] != expected[f]]})
+    elapsed = time.perf_counter() - start
+    return {
+        "archivos": len(files),
+        "exactos": exact,
+        "precision": exact / len(files) if files else 0.0,
+        "por_campo": {field: hits / len(files) for field, hits in field_hits.items()},
+        "niveles": tiers,
+        "ejemplos_fallidos": failures,
+        "archivos_por_s": len(files) / elapsed if elapsed else 0.0,
+    }
+
+
+def run_accuracy(corpus_dir, files, workers, sizes, templates_path):
+    # Las facturas sintéticas las resuelve todas la lectura rápida; las demás
+    # pasadas fuerzan pdfplumber, que es por donde pasan las facturas reales
+    # que la lectura rápida no resuelve, con y sin perfiles
+    truth = corpus.load_ground_truth(corpus_dir)
+    templates = load_templates(templates_path) if templates_path else None
+    passes = {"lectura rápida": _accuracy_pass(files, truth, templates, fast_path=True)}
+    if templates is not None:
+        passes["pdfplumber con plantillas"] = _accuracy_pass(files, truth, templates, fast_path=False)
+    passes["pdfplumber genérico"] = _accuracy_pass(files, truth, None, fast_path=False)
+    return {"precision": min(result["precision"] for result in passes.values()),
+            "pasadas": passes}
+
+
+def run_single(corpus_dir, files, workers, sizes, templates_path):
+    timings = {"texto": [], "campos": [], "duplicados": [], "guardado": [], "total": []}
+    tiers = {}
+    templates = load_templates(templates_path) if templates_path else None
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "clientes.xlsx")
+        corpus.generate_workbook(output, 1000)
+        storage = ExcelStorage(output)
+        start = time.perf_counter()
+        for pdf_path in files:
+            t0 = time.perf_counter()
+            stats = {"etapas": {}}
+            data = extract_pdf_data(pdf_path, stats=stats, templates=templates) or dict.fromkeys(FIELDS)
+            t2 = time.perf_counter()
+            tier = f"{stats['nivel']}/{stats.get('plantilla') or 'genérica'}"
+            tiers[tier] = tiers.get(tier, 0) + 1
+            exists = storage.exists(data["RUT"])
+            t3 = time.perf_counter()
+            if not exists:
+                storage.add(data)
+                storage.flush()
+            t4 = time.perf_counter()
+            timings["texto"].append(stats["etapas"].get("texto", 0.0))
+            timings["campos"].append(stats["etapas"].get("campos", 0.0))
+            timings["duplicados"].append(t3 - t2)
+            timings["guardado"].append(t4 - t3)
+            timings["total"].append(t4 - t0)
+        elapsed = time.perf_counter() - start
+        storage.close()
+    return {
+        "archivos": len(files),
+        "archivos_por_s": len(files) / elapsed if elapsed else 0.0,
+        "niveles": tiers,
+        "etapas": {stage: stage_summary(values) for stage, values in timings.items()},
+    }
+
+
+def _run_processor(output, files, workers, templates_path):
+    counts = {}
+    start = time.perf_counter()
+    processor = InvoiceProcessor(output, on_warning=lambda pdf_path, message: None,
+                                 templates_path=templates_path)
+    try:
+        for _, result in processor.process_files(files, workers=workers):
+            counts[result] = counts.get(result, 0) + 1
+    finally:
+        processor.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "archivos": len(files),
+        "workers": workers,
+        "segundos": elapsed,
+        "archivos_por_s": len(files) / elapsed if elapsed else 0.0,
+        "resultados": counts,
+    }
+
+
+def run_batch(corpus_dir, files, workers, sizes, templates_path):
+    with tempfile.TemporaryDirectory() as tmp:
+        return _run_processor(os.path.join(tmp, "clientes.xlsx"), files, workers, templates_path)
+
+
+def run_dedupe(corpus_dir, files, workers, sizes, templates_path):
+    results = {}
+    for size in sizes:
+        source = corpus.workbook_path(corpus_dir, size)
+        if not os.path.exists(source):
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "clientes.xlsx")
+            shutil.copyfile(source, output)
+            start = time.perf_counter()
+            RutIndex(output).refresh()
+            index_seconds = time.perf_counter() - start
+            results[str(size)] = _run_processor(output, files, workers, templates_path)
+            results[str(size)]["carga_indice_s"] = index_seconds
+    return results
+
+
+RUNNERS = {
+    "accuracy": run_accuracy,
+    "single": run_single,
+    "batch": run_batch,
+    "dedupe": run_dedupe,
+}
+
+
+def _scenario_entry(name, corpus_dir, files, workers, sizes, templates_path):
+    """Punto de entrada del proceso aislado de cada escenario"""
+    result = RUNNERS[name](corpus_dir, files, workers, sizes, templates_path)
+    result["memoria_max_mb"] = peak_rss_mb()
+    return result
+
+
+def run_isolated(name, corpus_dir, files, workers, sizes, templates_path):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(_scenario_entry, name, corpus_dir, files, workers, sizes,
+                               templates_path).result()
+
+
+def print_report(report):
+    print(f"Corpus: {report['corpus']} ({report['archivos']} archivos, workers={report['workers']}, "
+          f"plantillas: {report['plantillas'] or 'ninguna'})")
+    for name, result in report["escenarios"].items():
+        print(f"\n== {name}")
+        memory = result.pop("memoria_max_mb", None)
+        if name == "accuracy":
+            for pass_name, entry in result["pasadas"].items():
+                print(f"  -- {pass_name}: exactos {entry['exactos']}/{entry['archivos']} "
+                      f"({100 * entry['precision']:.1f}%), niveles: {entry['niveles']}")
+                for field, value in entry["por_campo"].items():
+                    print(f"  {field:<16} {100 * value:6.1f}%")
+                for failure in entry["ejemplos_fallidos"]:
+                    print(f"  falla: {failure['archivo']}: {', '.join(failure['campos'])}")
+        elif name == "single":
+            print(f"  {result['archivos_por_s']:.1f} archivos/s, niveles: {result['niveles']}")
+            print(f"  {'etapa':<12} {'media ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+            for stage, summary in result["etapas"].items():
+                print(f"  {stage:<12} {summary['media_ms']:9.2f} {summary['p50_ms']:9.2f} "
+                      f"{summary['p95_ms']:9.2f} {summary['total_s']:9.2f}")
+        elif name == "batch":
+            print(f"  {result['segundos']:.2f} s, {result['archivos_por_s']:.1f} archivos/s, {result['resultados']}")
+        elif name == "dedupe":
+            for size, entry in result.items():
+                print(f"  {size:>7} filas: índice {entry['carga_indice_s']:.2f} s, "
+                      f"lote {entry['segundos']:.2f} s, {entry['archivos_por_s']:.1f} archivos/s, "
+                      f"{entry['resultados']}")
+        if memory:
+            print(f"  memoria máxima: {memory['proceso']:.0f} MB (procesos hijos: {memory['hijos']:.0f} MB)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del extractor de facturas.")
+    parser.add_argument("--corpus", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus"),
+                        help="carpeta del corpus (se genera si no existe)")
+    parser.add_argument("--files", type=int, default=200, help="facturas del corpus a usar")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="tamaños de clientes.xlsx para el escenario dedupe")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"escenarios a correr, separados por coma ({', '.join(SCENARIOS)})")
+    parser.add_argument("--templates", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            "plantillas.json"),
+                        help="perfiles por plantilla de las facturas del corpus ('' para usar solo "
+                             "el análisis genérico)")
+    parser.add_argument("--json", action="store_true", help="imprimir el informe como JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    if not os.path.exists(os.path.join(args.corpus, corpus.GROUND_TRUTH_NAME)):
+        print(f"Generando corpus en {args.corpus}...", file=sys.stderr)
+        corpus.main([args.corpus, "--files", str(args.files), "--workbooks", args.sizes])
+    files = pdf_files(args.corpus, args.files)
+
+    report = {"corpus": args.corpus, "archivos": len(files), "workers": args.workers,
+              "plantillas": args.templates or None, "escenarios": {}}
+    for name in args.scenarios.split(","):
+        if name not in RUNNERS:
+            parser.error(f"escenario desconocido: {name}")
+        print(f"Corriendo {name}...", file=sys.stderr)
+        report["escenarios"][name] = run_isolated(name, args.corpus, files, args.workers, sizes,
+                                                   args.templates or None)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=1))
+    else:
+        print_report(report)
+    accuracy = report["escenarios"].get("accuracy")
+    return 1 if accuracy and accuracy["precision"] < 1.0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Extractor de datos de clientes desde facturas PDF.
+
+La interfaz gráfica vive en `lector_facturas.gui` y es el único módulo que
+importa PyQt5; el resto del paquete se puede usar sin entorno gráfico.
+"""
+from .extractor import (PARSER_VERSION, InvoiceProcessor, extract_data_from_text,
+                        extract_pdf_data, extract_text_from_pdf)
+from .rut import format_rut, is_valid, normalize_rut
+from .storage import (FIELDS, ExcelBatchWriter, ExcelStorage, RutIndex, ShardStorage,
+                      SQLiteStorage, merge_shards, normalize_workbook)
+from .templates import load_templates
+
+__all__ = [
+    "FIELDS",
+    "PARSER_VERSION",
+    "ExcelBatchWriter",
+    "ExcelStorage",
+    "InvoiceProcessor",
+    "RutIndex",
+    "SQLiteStorage",
+    "ShardStorage",
+    "extract_data_from_text",
+    "extract_pdf_data",
+    "extract_text_from_pdf",
+    "format_rut",
+    "is_valid",
+    "load_templates",
+    "merge_shards",
+    "normalize_rut",
+    "normalize_workbook",
+]
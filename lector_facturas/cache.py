@@ -0,0 +1,127 @@
+"""Caché persistente de extracciones, indexada por el contenido de cada PDF.
+
+Permite volver a procesar una carpeta sin pasar otra vez por pdfplumber los
+archivos que no cambiaron: se guarda el diccionario de datos extraído y el
+último resultado del proceso. Las entradas se invalidan al cambiar
+`PARSER_VERSION` y, al superar el tope de entradas, se descartan las usadas
+hace más tiempo.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+CacheEntry = namedtuple("CacheEntry", ["data", "outcome"])
+
+# Cada cuántas escrituras se confirma la transacción y se aplica el tope de tamaño
+COMMIT_EVERY = 100
+
+
+def default_cache_path(output_file):
+    """Ruta de la caché junto al archivo Excel: clientes.xlsx -> clientes_cache.sqlite"""
+    return os.path.splitext(output_file)[0] + "_cache.sqlite"
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 del contenido del archivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Caché de extracciones en SQLite con descarte LRU"""
+
+    def __init__(self, path, parser_version, max_entries=20000):
+        self.path = path
+        self.parser_version = parser_version
+        self.max_entries = max_entries
+        self._pending_writes = 0
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " key TEXT PRIMARY KEY,"
+            " parser_version INTEGER NOT NULL,"
+            " data TEXT,"
+            " outcome TEXT,"
+            " last_used REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)")
+        # Las extracciones hechas con otra versión del parser ya no son válidas
+        self._conn.execute("DELETE FROM extractions WHERE parser_version != ?",
+                           (parser_version,))
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def get(self, key):
+        """Devuelve la entrada guardada para `key`, o None si no existe"""
+        row = self._conn.execute("SELECT data, outcome FROM extractions WHERE key = ?",
+                                 (key,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE extractions SET last_used = ? WHERE key = ?",
+                           (time.time(), key))
+        self._written()
+        data = json.loads(row[0]) if row[0] is not None else None
+        return CacheEntry(data, row[1])
+
+    def put(self, key, data, outcome=None):
+        """Guarda el resultado de la extracción de un archivo"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (key, parser_version, data, outcome, last_used)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, self.parser_version,
+             json.dumps(data, ensure_ascii=False) if data is not None else None,
+             outcome, time.time()))
+        self._written()
+
+    def set_outcome(self, key, outcome):
+        """Actualiza el último resultado del proceso para un archivo"""
+        self._conn.execute("UPDATE extractions SET outcome = ? WHERE key = ?", (outcome, key))
+        self._written()
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        self._conn.execute("DELETE FROM extractions")
+        self._conn.commit()
+        self._pending_writes = 0
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    def _written(self):
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_EVERY:
+            self.commit()
+
+    def _evict(self):
+        """Descarta las entradas menos usadas si se supera el tope"""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM extractions WHERE key IN"
+                " (SELECT key FROM extractions ORDER BY last_used LIMIT ?)", (excess,))
+
+    def commit(self):
+        self._evict()
+        self._conn.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.commit()
+        self._conn.close()
+        self._conn = None
@@ -0,0 +1,283 @@
+"""Línea de comandos del extractor, para uso sin interfaz gráfica.
+
+Ejemplos:
+
+    python -m lector_facturas factura.pdf
+    python -m lector_facturas facturas/ "otras/**/*.pdf" --workers 8
+    python -m lector_facturas bandeja/ --output /datos/clientes.xlsx --format json
+    python -m lector_facturas bandeja/ --watch
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+
+from .cache import ExtractionCache, default_cache_path
+from .extractor import PARSER_VERSION, InvoiceProcessor, iter_pdf_paths
+from .metrics import Profiler, RunMetrics
+from .storage import ExcelStorage, ShardStorage, SQLiteStorage, merge_shards, normalize_workbook
+from .templates import default_templates_path, load_templates
+from .watch import watch_folder
+
+
+def parse_bbox(value):
+    """Convierte "x0,top,x1,bottom" en una tupla de números"""
+    try:
+        bbox = tuple(float(part) for part in value.split(","))
+    except ValueError:
+        bbox = ()
+    if len(bbox) != 4 or bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+        raise argparse.ArgumentTypeError(f"región no válida: {value}")
+    return bbox
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="lector_facturas",
+        description="Extrae datos de clientes desde facturas PDF y los guarda en Excel.")
+    parser.add_argument("inputs", nargs="*", metavar="RUTA",
+                        help="archivos PDF, carpetas o patrones glob")
+    parser.add_argument("-o", "--output", default="clientes.xlsx",
+                        help="archivo Excel de clientes (por defecto: clientes.xlsx)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="procesos para la extracción en paralelo (por defecto: núcleos disponibles)")
+    parser.add_argument("--queue-size", type=int, metavar="N",
+                        help="archivos en proceso o en espera a la vez con --workers > 1 "
+                             "(por defecto: 4 por worker)")
+    parser.add_argument("-f", "--format", choices=("text", "json"), default="text",
+                        help="formato del informe: texto legible o una línea JSON por archivo")
+    parser.add_argument("--checkpoint", type=int, default=50, metavar="N",
+                        help="guardar las filas nuevas en un fragmento cada N (0 = solo al final)")
+    parser.add_argument("--bbox", type=parse_bbox, metavar="X0,TOP,X1,BOTTOM",
+                        help="región de la página (en puntos) donde está la sección del cliente")
+    parser.add_argument("--all-pages", action="store_true",
+                        help="leer todas las páginas en vez de detenerse en la del cliente")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="no intentar la lectura rápida de la primera página; usar siempre pdfplumber")
+    parser.add_argument("--templates", metavar="RUTA",
+                        help="archivo JSON con los perfiles por plantilla de emisor "
+                             "(por defecto: plantillas.json junto al Excel, si existe)")
+    parser.add_argument("--backend", choices=("excel", "sqlite", "shards"), default="excel",
+                        help="dónde guardar los clientes: directamente en el Excel, en SQLite "
+                             "exportando el Excel al final o en fragmentos por proceso que se "
+                             "consolidan en el Excel (por defecto: excel)")
+    parser.add_argument("--db", metavar="RUTA",
+                        help="base SQLite del backend sqlite (por defecto: <output>.sqlite)")
+    parser.add_argument("--no-export", action="store_true",
+                        help="con el backend sqlite, no regenerar el Excel al terminar")
+    parser.add_argument("--export-only", action="store_true",
+                        help="con el backend sqlite, solo exportar la base al Excel y salir")
+    parser.add_argument("--shard-dir", metavar="RUTA",
+                        help="carpeta de fragmentos de los backends excel y shards "
+                             "(por defecto: <output>_fragmentos)")
+    parser.add_argument("--no-merge", action="store_true",
+                        help="con el backend shards, no consolidar los fragmentos al terminar")
+    parser.add_argument("--merge", action="store_true",
+                        help="solo consolidar los fragmentos pendientes en el Excel y salir")
+    parser.add_argument("--normalize-ruts", action="store_true",
+                        help="solo dar formato a los RUT del Excel, quitar los duplicados, "
+                             "informar los dígitos verificadores inválidos y salir")
+    parser.add_argument("--lock-timeout", type=float, default=60.0, metavar="SEG",
+                        help="segundos de espera si otro proceso está escribiendo el Excel")
+    parser.add_argument("--cache", metavar="RUTA",
+                        help="caché de extracciones (por defecto: <output>_cache.sqlite)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="no usar la caché: leer siempre todos los PDFs")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="vaciar la caché antes de procesar")
+    parser.add_argument("--cache-size", type=int, default=20000, metavar="N",
+                        help="máximo de archivos en la caché (por defecto: 20000)")
+    parser.add_argument("--watch", action="store_true",
+                        help="vigilar la carpeta indicada y procesar los PDFs a medida que llegan")
+    parser.add_argument("--debounce", type=float, default=2.0, metavar="SEG",
+                        help="segundos sin cambios antes de leer un PDF nuevo (por defecto: 2)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, metavar="SEG",
+                        help="intervalo de revisión de la carpeta (por defecto: 1)")
+    parser.add_argument("--batch-size", type=int, default=20, metavar="N",
+                        help="PDFs por lote en modo vigilancia (por defecto: 20)")
+    parser.add_argument("--merge-interval", type=float, default=60.0, metavar="SEG",
+                        help="en modo vigilancia, segundos entre actualizaciones del Excel "
+                             "(por defecto: 60)")
+    parser.add_argument("--merge-rows", type=int, default=500, metavar="N",
+                        help="en modo vigilancia, actualizar el Excel al acumular N clientes "
+                             "nuevos (por defecto: 500)")
+    parser.add_argument("--ledger", metavar="RUTA",
+                        help="registro de archivos procesados (por defecto: <carpeta>/.lector_procesados.jsonl)")
+    parser.add_argument("--metrics", metavar="RUTA",
+                        help="agregar las métricas de cada archivo a RUTA como líneas JSON")
+    parser.add_argument("--profile", metavar="RUTA",
+                        help="perfilar la ejecución con cProfile y guardar el perfil en RUTA "
+                             "(la extracción solo se perfila con --workers 1)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="medir las asignaciones de memoria con tracemalloc")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="mostrar mensajes de depuración de la extracción")
+    return parser
+
+
+def build_storage(args):
+    """Almacenamiento según --backend"""
+    checkpoint_every = args.checkpoint or None
+    if args.backend == "sqlite":
+        return SQLiteStorage(args.db or os.path.splitext(args.output)[0] + ".sqlite",
+                             export_path=None if args.no_export else args.output,
+                             checkpoint_every=checkpoint_every, lock_timeout=args.lock_timeout)
+    if args.backend == "shards":
+        return ShardStorage(args.output, args.shard_dir, checkpoint_every=checkpoint_every,
+                            merge_on_close=not args.no_merge, lock_timeout=args.lock_timeout)
+    return ExcelStorage(args.output, checkpoint_every=checkpoint_every,
+                        lock_timeout=args.lock_timeout, shard_dir=args.shard_dir)
+
+
+def export_database(args):
+    """Regenera el Excel desde la base SQLite, sin procesar PDFs"""
+    if args.backend != "sqlite":
+        print("--export-only requiere --backend sqlite.", file=sys.stderr)
+        return 2
+    storage = build_storage(args)
+    try:
+        storage.export_excel(args.output)
+    finally:
+        storage.export_path = None
+        storage.close()
+    print(f"Exportado {args.output}")
+    return 0
+
+
+def merge_output(args):
+    """Consolida los fragmentos pendientes en el Excel, sin procesar PDFs"""
+    try:
+        summary = merge_shards(args.output, args.shard_dir, lock_timeout=args.lock_timeout)
+    except TimeoutError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"Consolidados {summary['fragmentos']} fragmentos en {args.output}: "
+          f"{summary['agregados']} clientes nuevos, {summary['duplicados']} duplicados")
+    return 0
+
+
+def normalize_output(args):
+    """Normaliza los RUT del Excel y quita duplicados, sin procesar PDFs"""
+    try:
+        summary = normalize_workbook(args.output, lock_timeout=args.lock_timeout)
+    except (OSError, ValueError, TimeoutError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    if args.format == "json":
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        print(f"{args.output}: {summary['filas']} filas, {summary['duplicados']} duplicados "
+              f"eliminados, {summary['invalidos']} RUT con dígito verificador inválido, "
+              f"{summary['sin_rut']} sin RUT")
+        for rut in summary["ejemplos_invalidos"]:
+            print(f"  RUT inválido: {rut}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(format="%(levelname)s %(name)s: %(message)s")
+    if args.verbose:
+        logging.getLogger("lector_facturas").setLevel(logging.DEBUG)
+    if args.export_only:
+        return export_database(args)
+    if args.merge:
+        return merge_output(args)
+    if args.normalize_ruts:
+        return normalize_output(args)
+    if not args.inputs:
+        print("Indique al menos un archivo, carpeta o patrón.", file=sys.stderr)
+        return 2
+    if args.watch:
+        if len(args.inputs) != 1 or not os.path.isdir(args.inputs[0]):
+            print("El modo --watch requiere una sola carpeta.", file=sys.stderr)
+            return 2
+    else:
+        # Las rutas se recorren a medida que se procesan; solo se adelanta la primera
+        pdf_paths = iter_pdf_paths(args.inputs)
+        first = next(pdf_paths, None)
+        if first is None:
+            print("No se encontraron archivos PDF.", file=sys.stderr)
+            return 1
+        pdf_paths = itertools.chain([first], pdf_paths)
+
+    cache_path = None
+    if not args.no_cache:
+        cache_path = args.cache or default_cache_path(args.output)
+        if args.clear_cache:
+            with ExtractionCache(cache_path, PARSER_VERSION) as cache:
+                cache.clear()
+
+    templates_path = args.templates or default_templates_path(args.output)
+    if templates_path:
+        try:
+            load_templates(templates_path)
+        except (OSError, ValueError) as e:
+            print(f"No se pudieron cargar las plantillas: {str(e)}", file=sys.stderr)
+            return 2
+
+    warnings = {}
+    if args.format == "json":
+        on_warning = lambda pdf_path, message: warnings.setdefault(pdf_path, []).append(message)
+    else:
+        on_warning = lambda pdf_path, message: print(f"{pdf_path}: Advertencia: {message}", file=sys.stderr)
+
+    counts = {"success": 0, "duplicate": 0, "invalid_rut": 0, "error": 0}
+    saved = True
+    interrupted = False
+    metrics = RunMetrics(args.metrics)
+    profiler = Profiler(args.profile, args.tracemalloc)
+    processor = InvoiceProcessor(args.output, checkpoint_every=args.checkpoint or None,
+                                 on_warning=on_warning, client_bbox=args.bbox,
+                                 all_pages=args.all_pages, fast_path=not args.no_fast_path,
+                                 templates_path=templates_path, cache_path=cache_path,
+                                 cache_size=args.cache_size, storage=build_storage(args),
+                                 metrics=metrics)
+    if args.watch:
+        print(f"Vigilando {args.inputs[0]} (Ctrl+C para terminar)...", file=sys.stderr)
+        results = watch_folder(processor, args.inputs[0], workers=args.workers,
+                               batch_size=args.batch_size, debounce=args.debounce,
+                               poll_interval=args.poll_interval, ledger_path=args.ledger,
+                               merge_interval=args.merge_interval, merge_rows=args.merge_rows)
+    else:
+        results = processor.process_files(pdf_paths, workers=args.workers,
+                                          queue_size=args.queue_size)
+    try:
+        profiler.start()
+        for pdf_path, result in results:
+            counts[result] = counts.get(result, 0) + 1
+            if args.format == "json":
+                print(json.dumps({"archivo": pdf_path, "resultado": result,
+                                  "advertencias": warnings.pop(pdf_path, [])},
+                                 ensure_ascii=False), flush=args.watch)
+            else:
+                print(f"{pdf_path}: {result}", flush=args.watch)
+    except KeyboardInterrupt:
+        # Se guarda lo procesado hasta el momento
+        interrupted = True
+    finally:
+        results.close()
+        try:
+            processor.close()
+        except Exception as e:
+            saved = False
+            print(f"Error al guardar el archivo Excel: {str(e)}", file=sys.stderr)
+        profiler.stop()
+        metrics.close()
+
+    if args.format == "json":
+        print(json.dumps({"resumen": counts, "guardado": saved, "metricas": metrics.summary()},
+                         ensure_ascii=False))
+    else:
+        print(f"Proceso completado: {counts['success']} archivos procesados, "
+              f"{counts['duplicate']} duplicados, "
+              f"{counts['invalid_rut']} con RUT inválido, "
+              f"{counts['error']} con errores")
+        print(metrics.format_summary())
+    if args.profile or args.tracemalloc:
+        print(profiler.report(), file=sys.stderr)
+    if interrupted:
+        return 130
+    return 0 if saved and not counts["error"] and not counts["invalid_rut"] else 1
@@ -0,0 +1,624 @@
+"""Extracción de datos de clientes desde facturas PDF, sin dependencias de Qt.
+
+Este módulo concentra la lógica que usan tanto la interfaz gráfica como la
+línea de comandos: lectura del PDF, extracción de campos y el procesamiento
+por lotes que verifica duplicados por RUT y guarda los clientes (ver
+`storage.py`).
+"""
+import glob
+import itertools
+import logging
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+import pdfplumber
+
+from .cache import ExtractionCache, file_hash
+from .metrics import new_file_entry
+from .rut import format_rut, is_valid
+from .storage import FIELDS, ExcelStorage
+from .templates import load_templates
+from .textlayer import read_first_page
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pdf_paths(inputs):
+    """Recorre archivos, carpetas y patrones glob y entrega las rutas de los PDFs.
+
+    Es un generador: las rutas se producen a medida que se consumen, sin
+    armar la lista completa. Una misma ruta no se entrega dos veces.
+    """
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = (os.path.join(item, name) for name in sorted(os.listdir(item))
+                       if name.lower().endswith(".pdf"))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+        else:
+            matches = (item,)
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+CLIENT_SECTION_MARKER = "SEÑOR(ES):"
+
+
+def extract_text_from_pdf(pdf_path, client_bbox=None, all_pages=False, stats=None):
+    """Extrae el texto de un PDF hasta la página que contiene los datos del cliente.
+
+    La lectura se detiene en la primera página con "SEÑOR(ES):", salvo que se
+    pida `all_pages`. Si se indica `client_bbox` (x0, top, x1, bottom, en
+    puntos), primero se lee solo esa región de cada página, de modo que las
+    tablas de detalle no pasan por el análisis de diseño; si la región no
+    contiene la sección del cliente se lee la página completa. Si se pasa el
+    diccionario `stats`, se anotan en él las páginas leídas, las totales y el
+    productor del PDF.
+
+    Los cachés de cada página se liberan apenas se lee su texto, para que la
+    memoria no crezca con el número de páginas.
+    """
+    texts = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            page_text = None
+            region_bbox = _clip_bbox(client_bbox, page) if client_bbox is not None else None
+            if region_bbox is not None:
+                region = page.within_bbox(region_bbox)
+                page_text = region.extract_text() or ""
+                if CLIENT_SECTION_MARKER not in page_text.upper():
+                    page_text = None
+            if page_text is None:
+                page_text = page.extract_text() or ""
+            texts.append(page_text)
+            # Liberar los objetos de diseño de la página antes de pasar a la siguiente
+            page.close()
+
+            if not all_pages and CLIENT_SECTION_MARKER in page_text.upper():
+                break
+        if stats is not None:
+            stats["paginas"] = len(texts)
+            stats["paginas_total"] = len(pdf.pages)
+            stats["productor"] = pdf.metadata.get("Producer")
+    return "\n".join(texts) + "\n"
+
+
+def _clip_bbox(bbox, page):
+    """Ajusta la región configurada a los límites de la página; None si queda fuera de ella"""
+    x0, top, x1, bottom = bbox
+    page_x0, page_top, page_x1, page_bottom = page.bbox
+    clipped = (max(x0, page_x0), max(top, page_top), min(x1, page_x1), min(bottom, page_bottom))
+    if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+        return None
+    return clipped
+
+
+# Versión de la extracción de campos: subirla al cambiar los patrones invalida
+# las entradas guardadas en la caché de extracciones
+PARSER_VERSION = 3
+
+# Patrones de la sección del cliente, compilados una sola vez al importar el módulo
+CLIENT_SECTION_RE = re.compile(
+    r'SEÑOR\(ES\):(.*?)(?=FACTURA|\bCOND\b|DETALLE|FECHA|FORMA DE PAGO|$)',
+    re.DOTALL | re.IGNORECASE)
+RAZON_SOCIAL_RE = re.compile(r'SEÑOR\(ES\):\s*(.+?)(?=\n|R\.U\.T\.|$)', re.IGNORECASE)
+RUT_RE = re.compile(r'R\.U\.T\.:\s*([\d\.]+)-\s*([0-9kK])', re.IGNORECASE)
+# RUT con dígito verificador explícito; sin él, el último dígito del cuerpo se tomaría como verificador
+RUT_VALUE_RE = re.compile(r'([\d\.]+)\s*-\s*([0-9kK])', re.IGNORECASE)
+PHONE_RE = re.compile(r'F:\s*[:\-]?\s*(\d[\d\s\-]*)', re.IGNORECASE)
+NON_DIGIT_RE = re.compile(r'\D')
+
+# Campos de texto de la sección del cliente: (campo, patrón)
+CLIENT_FIELD_PATTERNS = (
+    ("Giro", re.compile(r'GIRO:\s*(.*?)(?=\n|DIRECC|$)', re.IGNORECASE)),
+    ("Dirección", re.compile(r'DIRECCION:\s*(.*?)(?=\n|COMUNA|$)', re.IGNORECASE)),
+    ("Comuna", re.compile(r'COMUNA\s*(.*?)(?=\n|CIUDAD|$)', re.IGNORECASE)),
+    ("Ciudad", re.compile(r'CIUDAD:\s*(.*?)(?=\n|CONTACTO|$)', re.IGNORECASE)),
+    ("Nombre contacto", re.compile(r'CONTACTO:\s*(.*?)(?=\n|F:|$)', re.IGNORECASE)),
+)
+
+# Patrones de la búsqueda alternativa, cuando la sección no trae un RUT con el formato esperado
+FALLBACK_RAZON_SOCIAL_RE = re.compile(r'SEÑOR\(ES\):\s*(.*?)(?=\n|R\.U\.T\.)', re.IGNORECASE)
+FALLBACK_RUT_RE = re.compile(r'R\.U\.T\.:\s*([\d\.]+)\s*-\s*([0-9kK])', re.IGNORECASE)
+FALLBACK_PHONE_RE = re.compile(r'F:\s*(\d+)', re.IGNORECASE)
+FALLBACK_FIELD_PATTERNS = (
+    ("Giro", re.compile(r'GIRO:\s*(.*?)(?=\n|DIRECC|$)', re.IGNORECASE)),
+    ("Dirección", re.compile(r'DIRECCION:\s*(.*?)(?=\n|COMUNA|$)', re.IGNORECASE)),
+    ("Comuna", re.compile(r'COMUNA:\s*(.*?)(?=\n|CIUDAD|$)', re.IGNORECASE)),
+    ("Ciudad", re.compile(r'CIUDAD:\s*(.*?)(?=\n|CONTACTO|$)', re.IGNORECASE)),
+    ("Nombre contacto", re.compile(r'CONTACTO:\s*(.*?)(?=\n|F:|$)', re.IGNORECASE)),
+)
+
+
+def _format_phone(numero, default_prefix):
+    """Da formato +569 XXXXXXXX a los números de celular de 8 o 9 dígitos"""
+    if len(numero) == 9 and numero.startswith('9'):
+        return f"+569 {numero[1:]}"
+    if len(numero) == 8:
+        return f"+569 {numero}"
+    # Si el formato es diferente, guardar el número sin cambios
+    return f"{default_prefix}{numero}"
+
+
+def extract_with_profile(text, profile):
+    """Extrae los datos con el perfil de una plantilla conocida (ver `templates.py`).
+
+    Solo se recorre la sección del cliente y cada etiqueta se busca al
+    comienzo de una línea; no hay búsqueda alternativa.
+    """
+    data = dict.fromkeys(FIELDS)
+    bounds = profile.section_bounds(text)
+    if bounds is None:
+        return data
+    start, end = bounds
+    for field, pattern in profile.patterns:
+        match = pattern.search(text, start, end)
+        if match and match.group(1):
+            data[field] = match.group(1)
+    if data["RUT"]:
+        rut_match = RUT_VALUE_RE.match(data["RUT"])
+        data["RUT"] = format_rut(f"{rut_match.group(1)}-{rut_match.group(2)}") if rut_match else None
+    if data["Teléfono"]:
+        numero = NON_DIGIT_RE.sub('', data["Teléfono"])
+        data["Teléfono"] = _format_phone(numero, profile.phone_prefix) if numero else None
+    return data
+
+
+def extract_data_from_text(text, profile=None):
+    """Extrae datos específicos del texto usando expresiones regulares.
+
+    Con el `profile` de una plantilla conocida se usa `extract_with_profile`.
+    """
+    if profile is not None:
+        return extract_with_profile(text, profile)
+    data = dict.fromkeys(FIELDS)
+
+    # Primero identificamos la sección del cliente: el texto entre "SEÑOR(ES):"
+    # y algún otro indicador de fin de sección
+    cliente_section_match = CLIENT_SECTION_RE.search(text)
+
+    if cliente_section_match:
+        cliente_text = cliente_section_match.group(1)
+
+        # Extraer Razón Social
+        razon_social_match = RAZON_SOCIAL_RE.search(text)
+        if razon_social_match:
+            data["Razón social"] = razon_social_match.group(1).strip()
+        else:
+            logger.debug("No se encontró la razón social. Texto extraído:\n%s", text)
+
+        # Extraer RUT y formatearlo como xx.xxx.xxx-N
+        rut_match = RUT_RE.search(cliente_text)
+        if rut_match:
+            data["RUT"] = format_rut(f"{rut_match.group(1)}-{rut_match.group(2)}")
+        else:
+            logger.debug("No se encontró un RUT válido en la sección del cliente.")
+
+        # Extraer Giro, Dirección, Comuna, Ciudad y Nombre de contacto
+        for field, pattern in CLIENT_FIELD_PATTERNS:
+            match = pattern.search(cliente_text)
+            if match:
+                data[field] = match.group(1).strip()
+
+        # Extraer Teléfono y corregir formato
+        telefono_match = PHONE_RE.search(cliente_text)
+        if telefono_match:
+            numero = NON_DIGIT_RE.sub('', telefono_match.group(1))
+            data["Teléfono"] = _format_phone(numero, "+56 ")
+
+    # Si no encontramos el RUT en la sección del cliente, hacer una búsqueda más
+    # general a partir de "SEÑOR(ES):" (sin copiar el texto, usando posiciones)
+    if not data["RUT"]:
+        señores_pos = text.find("SEÑOR(ES):")
+        if señores_pos != -1:
+            if not data["Razón social"]:
+                razon_social_match = FALLBACK_RAZON_SOCIAL_RE.search(text, señores_pos)
+                if razon_social_match:
+                    data["Razón social"] = razon_social_match.group(1).strip()
+
+            # El RUT se guarda con el mismo formato que en la búsqueda principal
+            rut_match = FALLBACK_RUT_RE.search(text, señores_pos)
+            if rut_match:
+                data["RUT"] = format_rut(f"{rut_match.group(1)}-{rut_match.group(2)}")
+
+            # Si encontramos RUT, buscar el resto de los datos a partir de ahí
+            rut_pos = rut_match.start(1) if data["RUT"] else -1
+            if rut_pos != -1:
+                for field, pattern in FALLBACK_FIELD_PATTERNS:
+                    if not data[field]:
+                        match = pattern.search(text, rut_pos)
+                        if match:
+                            data[field] = match.group(1).strip()
+
+                if not data["Teléfono"]:
+                    telefono_match = FALLBACK_PHONE_RE.search(text, rut_pos)
+                    if telefono_match:
+                        data["Teléfono"] = _format_phone(telefono_match.group(1), "")
+
+    return data
+
+
+def _is_complete(data):
+    """Valida el resultado de la lectura rápida: razón social y RUT con dígito verificador correcto"""
+    return bool(data["Razón social"]) and is_valid(data["RUT"])
+
+
+def extract_pdf_data(pdf_path, client_bbox=None, all_pages=False, stats=None, fast_path=True,
+                     templates=None):
+    """Etapa de extracción (texto + campos) que se ejecuta en el pool de procesos.
+
+    La extracción tiene dos niveles. Primero se lee la capa de texto de la
+    primera página sin análisis de diseño (ver `textlayer.py`); si ahí no
+    aparece la razón social o un RUT válido, se lee el PDF con pdfplumber.
+    Con `all_pages` o `fast_path=False` se usa solo pdfplumber.
+
+    Con `templates` (un `templates.TemplateSet`), la factura se compara con
+    los perfiles conocidos y, si coincide con uno, los campos se extraen con
+    ese perfil y pdfplumber lee la región del perfil. Si el perfil no
+    encuentra el RUT en el texto de pdfplumber se usa el análisis genérico.
+
+    Devuelve el diccionario de datos, o None si el PDF no tiene texto. Si se
+    pasa `stats` (ver `metrics.new_file_entry`), se anotan los tiempos de
+    cada etapa, las páginas leídas, el nivel usado ("rapido" o "pdfplumber")
+    y la plantilla reconocida.
+    """
+    stats = stats if stats is not None else {"etapas": {}}
+    start = time.perf_counter()
+    profile = None
+    if fast_path and not all_pages:
+        try:
+            page = read_first_page(pdf_path, stats)
+        except Exception as e:
+            logger.debug("%s: falló la lectura rápida (%s)", pdf_path, e)
+            page = None
+        parsed = time.perf_counter()
+        if page is not None and page.text:
+            if templates is not None:
+                profile = templates.match(page.producer, page.text)
+            data = extract_data_from_text(page.text, profile)
+            if _is_complete(data):
+                stats["etapas"]["texto"] = parsed - start
+                stats["etapas"]["campos"] = time.perf_counter() - parsed
+                stats["nivel"] = "rapido"
+                stats["plantilla"] = profile.name if profile is not None else None
+                return data
+        logger.debug("%s: la lectura rápida no encontró un RUT válido, se usa pdfplumber", pdf_path)
+
+    stats["nivel"] = "pdfplumber"
+    if client_bbox is None and profile is not None:
+        client_bbox = profile.bbox
+    text = extract_text_from_pdf(pdf_path, client_bbox, all_pages, stats)
+    parsed = time.perf_counter()
+    # El tiempo de texto incluye el intento de lectura rápida descartado
+    stats["etapas"]["texto"] = parsed - start
+    if not text:
+        return None
+    if profile is None and templates is not None:
+        profile = templates.match(stats.get("productor"), text)
+    data = extract_data_from_text(text, profile)
+    if profile is not None and not data["RUT"]:
+        logger.debug("%s: la plantilla %s no encontró el RUT, se usa el análisis genérico",
+                     pdf_path, profile.name)
+        profile = None
+        data = extract_data_from_text(text)
+    stats["plantilla"] = profile.name if profile is not None else None
+    stats["etapas"]["campos"] = time.perf_counter() - parsed
+    return data
+
+
+def _extract_with_stats(pdf_path, client_bbox, all_pages, fast_path, templates_path):
+    """Versión para el pool: devuelve (datos, estadísticas de la extracción)"""
+    stats = {"etapas": {}}
+    templates = load_templates(templates_path) if templates_path else None
+    return extract_pdf_data(pdf_path, client_bbox, all_pages, stats, fast_path, templates), stats
+
+
+class InvoiceProcessor:
+    """Valida los datos extraídos, descarta duplicados y los guarda en Excel.
+
+    Las advertencias de cada archivo se entregan a `on_warning(ruta, mensaje)`;
+    si no se indica, se imprimen por consola. Con `cache_path` se usa una
+    caché de extracciones para no volver a leer los PDFs que no cambiaron.
+    Por defecto los clientes se guardan en el Excel `output_file`; con
+    `storage` se puede usar otro almacenamiento (ver `storage.py`). Si se
+    pasa `metrics` (un `metrics.RunMetrics`), se registran los tiempos por
+    etapa de cada archivo procesado con `process_files`. Con
+    `fast_path=False` se omite la lectura rápida y todo pasa por pdfplumber.
+    `templates_path` es un archivo de perfiles por plantilla (ver
+    `templates.py`).
+    """
+
+    def __init__(self, output_file="clientes.xlsx", rut_index=None,
+                 checkpoint_every=None, on_warning=None, client_bbox=None,
+                 all_pages=False, cache_path=None, cache_size=20000, storage=None,
+                 metrics=None, fast_path=True, templates_path=None):
+        self.output_file = output_file
+        self.client_bbox = client_bbox
+        self.all_pages = all_pages
+        self.fast_path = fast_path
+        # Se cargan aquí para detectar un archivo inválido antes de empezar el lote
+        self.templates_path = templates_path
+        self.templates = load_templates(templates_path) if templates_path else None
+        self.storage = storage if storage is not None else ExcelStorage(
+            output_file, rut_index, checkpoint_every=checkpoint_every)
+        self.on_warning = on_warning
+        self.cache = (ExtractionCache(cache_path, PARSER_VERSION, max_entries=cache_size)
+                      if cache_path else None)
+        self.metrics = metrics
+        self._file_stats = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def warn(self, pdf_path, message):
+        if self.on_warning is not None:
+            self.on_warning(pdf_path, message)
+        else:
+            print(f"{pdf_path}: {message}")
+
+    def process_files(self, file_paths, workers=1, on_progress=None, queue_size=None):
+        """Procesa PDFs y entrega (ruta, resultado) en el orden de entrada.
+
+        `file_paths` puede ser cualquier iterable, incluso un generador: las
+        rutas se consumen a medida que hace falta. Con `workers` > 1 la
+        extracción corre en un pool de procesos con a lo sumo `queue_size`
+        archivos (por defecto 4 por worker) en proceso o esperando su turno,
+        así la memoria no crece con el tamaño del lote. La verificación de
+        duplicados y la escritura se hacen siempre en el proceso que consume
+        el generador. Dejar de iterar cancela los archivos pendientes.
+        `on_progress(hechos, total)` recibe None como total si no se conoce.
+        Un solo archivo se procesa sin pool, porque iniciarlo cuesta más que
+        la extracción.
+        """
+        total = len(file_paths) if hasattr(file_paths, "__len__") else None
+        paths = iter(file_paths)
+        if workers > 1 and total is None:
+            # Mirar las dos primeras rutas para saber si hay más de un archivo
+            head = list(itertools.islice(paths, 2))
+            if len(head) < 2:
+                total = len(head)
+            paths = itertools.chain(head, paths)
+        if workers <= 1 or (total is not None and total <= 1):
+            for i, pdf_path in enumerate(paths):
+                self._begin_file(pdf_path)
+                try:
+                    result = self.extract_and_save_data(pdf_path)
+                except Exception as e:
+                    self.warn(pdf_path, f"Error al procesar: {str(e)}")
+                    result = "error"
+                self._end_file(result)
+                if on_progress is not None:
+                    on_progress(i + 1, total)
+                yield pdf_path, result
+            return
+
+        window = queue_size or workers * 4
+        exhausted = False
+        completed = {}  # índice -> (ruta, clave de caché, entrada de caché, future)
+        futures = {}    # future -> (índice, ruta, clave de caché)
+        assigned = 0
+        next_index = 0
+        done_count = 0
+
+        def drain():
+            nonlocal next_index
+            while next_index in completed:
+                pdf_path, key, entry, future = completed.pop(next_index)
+                next_index += 1
+                self._begin_file(pdf_path)
+                try:
+                    if entry is not None:
+                        data = entry.data
+                        self._note_stats(cache=True)
+                    else:
+                        data, stats = future.result()
+                        self._note_stats(**stats)
+                        self._cache_store(key, data)
+                    result = self.save_extracted_data(pdf_path, data)
+                except Exception as e:
+                    self.warn(pdf_path, f"Error al procesar: {str(e)}")
+                    result = "error"
+                self._cache_outcome(key, result)
+                self._end_file(result)
+                yield pdf_path, result
+
+        executor = None
+        try:
+            while True:
+                # Completar la ventana; los archivos que ya están en la caché no pasan por el pool
+                while not exhausted and assigned - next_index < window:
+                    pdf_path = next(paths, None)
+                    if pdf_path is None:
+                        exhausted = True
+                        break
+                    key, entry = self._cache_lookup(pdf_path)
+                    if entry is not None:
+                        completed[assigned] = (pdf_path, key, entry, None)
+                        done_count += 1
+                    else:
+                        if executor is None:
+                            executor = ProcessPoolExecutor(max_workers=workers)
+                        future = executor.submit(_extract_with_stats, pdf_path, self.client_bbox,
+                                                 self.all_pages, self.fast_path,
+                                                 self.templates_path)
+                        futures[future] = (assigned, pdf_path, key)
+                    assigned += 1
+
+                yield from drain()
+                if on_progress is not None:
+                    on_progress(done_count, total)
+                if not futures:
+                    if exhausted:
+                        break
+                    continue
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, pdf_path, key = futures.pop(future)
+                    completed[i] = (pdf_path, key, None, future)
+                    done_count += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def extract_and_save_data(self, pdf_path):
+        """Extrae datos del PDF y los guarda en Excel si no existe el RUT"""
+        key, entry = self._cache_lookup(pdf_path)
+        if entry is not None:
+            # El archivo no cambió desde la última vez: no hace falta leerlo
+            data = entry.data
+            self._note_stats(cache=True)
+        else:
+            # Extraer texto y datos del PDF
+            try:
+                data = extract_pdf_data(pdf_path, self.client_bbox, self.all_pages,
+                                        self._file_stats, self.fast_path, self.templates)
+            except Exception as e:
+                self.warn(pdf_path, f"Error al leer el PDF: {str(e)}")
+                return "error"
+            self._cache_store(key, data)
+
+        result = self.save_extracted_data(pdf_path, data)
+        self._cache_outcome(key, result)
+        return result
+
+    def _begin_file(self, pdf_path):
+        if self.metrics is None:
+            return
+        try:
+            size = os.path.getsize(pdf_path)
+        except OSError:
+            size = None
+        self._file_stats = new_file_entry(pdf_path, size)
+
+    def _note_stats(self, etapas=None, **values):
+        """Agrega datos a las métricas del archivo en curso"""
+        if self._file_stats is None:
+            return
+        self._file_stats.update(values)
+        if etapas:
+            self._file_stats["etapas"].update(etapas)
+
+    def _end_file(self, result):
+        if self._file_stats is None:
+            return
+        self._file_stats["resultado"] = result
+        self.metrics.record(self._file_stats)
+        self._file_stats = None
+
+    @contextmanager
+    def _stage(self, name):
+        """Mide la duración de una etapa del archivo en curso"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._note_stats(etapas={name: time.perf_counter() - start})
+
+    def _cache_lookup(self, pdf_path):
+        """Devuelve (clave, entrada) de la caché para el archivo; (None, None) si no aplica"""
+        if self.cache is None:
+            return None, None
+        try:
+            key = f"{file_hash(pdf_path)}:{self.client_bbox}:{self.all_pages}:{self.fast_path}"
+            if self.templates is not None:
+                key += f":{self.templates.digest}"
+        except OSError:
+            # El error se informará al intentar leer el PDF
+            return None, None
+        return key, self.cache.get(key)
+
+    def _cache_store(self, key, data):
+        if key is not None:
+            self.cache.put(key, data)
+
+    def _cache_outcome(self, key, result):
+        if key is not None:
+            self.cache.set_outcome(key, result)
+
+    def save_extracted_data(self, pdf_path, data):
+        """Valida los datos extraídos y los guarda en Excel si no existe el RUT.
+
+        Devuelve "success", "duplicate", "invalid_rut" (dígito verificador
+        incorrecto) o "error".
+        """
+        if data is None:
+            return "error"
+
+        # Verificar si hay datos suficientes
+        if not data["RUT"]:
+            self.warn(pdf_path, "No se pudo encontrar el RUT del cliente en el documento.")
+            return "error"
+
+        # Un dígito verificador incorrecto suele ser un error de lectura: no crear un cliente fantasma
+        if not is_valid(data["RUT"]):
+            self.warn(pdf_path, f"El RUT {data['RUT']} tiene un dígito verificador inválido. No se guardó.")
+            return "invalid_rut"
+
+        # Validar si hay campos faltantes importantes
+        missing_fields = [k for k, v in data.items() if not v]
+        if missing_fields:
+            self.warn(pdf_path, f"No se pudieron encontrar los siguientes campos: {', '.join(missing_fields)}")
+
+        # Verificar si el cliente ya existe
+        with self._stage("duplicados"):
+            exists = self.client_exists(data["RUT"], pdf_path)
+        if exists:
+            return "duplicate"
+
+        # Guardar datos en Excel
+        with self._stage("guardado"):
+            self.save_to_excel(data)
+        return "success"
+
+    def client_exists(self, rut, pdf_path=None):
+        """Verifica si el RUT ya existe en el archivo Excel"""
+        try:
+            return self.storage.exists(rut)
+        except Exception as e:
+            self.warn(pdf_path or self.output_file,
+                      f"Error al verificar duplicados: {str(e)}. Continuando con el proceso...")
+            return False
+
+    def save_to_excel(self, data):
+        """Agrega los datos al lote; la fila se escribe en el próximo volcado"""
+        self.storage.add(data)
+
+    def checkpoint(self):
+        """Deja lo procesado a salvo en disco sin reescribir el Excel"""
+        start = time.perf_counter()
+        self.storage.checkpoint()
+        if self.metrics is not None:
+            self.metrics.add_run_time("volcado", time.perf_counter() - start)
+        if self.cache is not None:
+            self.cache.commit()
+
+    def flush(self):
+        """Guarda en disco lo procesado hasta ahora, sin cerrar la sesión"""
+        start = time.perf_counter()
+        self.storage.flush()
+        if self.metrics is not None:
+            self.metrics.add_run_time("volcado", time.perf_counter() - start)
+        if self.cache is not None:
+            self.cache.commit()
+
+    def close(self):
+        """Guarda las filas pendientes en el archivo Excel"""
+        start = time.perf_counter()
+        try:
+            self.storage.close()
+            if self.metrics is not None:
+                self.metrics.add_run_time("volcado", time.perf_counter() - start)
+        finally:
+            if self.cache is not None:
+                self.cache.close()
@@ -0,0 +1,299 @@
+"""Interfaz gráfica (PyQt5) del extractor de datos de clientes."""
+import sys
+import os
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QFileDialog, 
+                           QLabel, QVBoxLayout, QWidget, QMessageBox, QProgressBar,
+                           QPlainTextEdit)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+
+from .cache import default_cache_path
+from .extractor import InvoiceProcessor
+from .metrics import RunMetrics
+from .storage import RutIndex
+from .templates import default_templates_path, load_templates
+
+RESULT_LABELS = {
+    "success": "guardado",
+    "duplicate": "duplicado, no se agregó",
+    "invalid_rut": "RUT con dígito verificador inválido, no se agregó",
+    "error": "error",
+}
+
+
+class BatchWorker(QThread):
+    """Procesa un lote de PDFs fuera del hilo de la interfaz.
+
+    Informa el avance, el resultado de cada archivo y las advertencias
+    mediante señales, y se puede cancelar: se detiene después del archivo
+    en curso y guarda lo procesado hasta ese momento.
+    """
+
+    progress = pyqtSignal(int, int)       # archivos procesados, total
+    file_done = pyqtSignal(str, str)      # ruta, resultado
+    warning = pyqtSignal(str, str)        # ruta, mensaje
+    stats_ready = pyqtSignal(str)         # resumen de tiempos por etapa
+    batch_finished = pyqtSignal(dict, bool)  # conteos, se pudo guardar
+
+    def __init__(self, file_paths, output_file, rut_index, workers=1, **processor_options):
+        super().__init__()
+        self.file_paths = list(file_paths)
+        self.output_file = output_file
+        self.rut_index = rut_index
+        self.workers = workers
+        self.processor_options = processor_options
+        self._cancelled = False
+
+    def cancel(self):
+        """Pide detener el lote después del archivo en curso"""
+        self._cancelled = True
+
+    def run(self):
+        counts = {"success": 0, "duplicate": 0, "invalid_rut": 0, "error": 0}
+        saved = True
+        metrics = RunMetrics()
+        processor = InvoiceProcessor(self.output_file, self.rut_index,
+                                     on_warning=self.warning.emit, metrics=metrics,
+                                     **self.processor_options)
+        results = processor.process_files(self.file_paths, workers=self.workers,
+                                          on_progress=self.progress.emit)
+        try:
+            for pdf_path, result in results:
+                counts[result] = counts.get(result, 0) + 1
+                self.file_done.emit(pdf_path, result)
+                if self._cancelled:
+                    break
+        finally:
+            results.close()
+            try:
+                processor.close()
+            except Exception as e:
+                saved = False
+                self.warning.emit(self.output_file, f"Error al guardar el archivo Excel: {str(e)}")
+        self.stats_ready.emit(metrics.format_summary())
+        self.batch_finished.emit(counts, saved)
+
+
+class PDFExtractorApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Extractor de Datos de Clientes")
+        self.setGeometry(100, 100, 600, 550)
+        self.output_file = "clientes.xlsx"
+        self.rut_index = RutIndex(self.output_file)
+        self.worker = None
+        self.checkpoint_every = 50
+        self.client_bbox = None  # (x0, top, x1, bottom) de la sección del cliente, si se conoce
+        self.workers = os.cpu_count() or 1
+        self.initUI()
+
+    def initUI(self):
+        # Layout principal
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout()
+        main_widget.setLayout(layout)
+        
+        # Título
+        title_label = QLabel("Extractor de Datos de Clientes")
+        title_label.setAlignment(Qt.AlignCenter)
+        title_label.setStyleSheet("font-size: 18px; font-weight: bold; margin: 10px;")
+        layout.addWidget(title_label)
+        
+        # Descripción
+        desc_label = QLabel("Esta aplicación extrae datos de clientes desde facturas PDF y los guarda en Excel.\n"
+                           "Si el RUT ya existe en la base de datos, no se duplicará el registro.")
+        desc_label.setAlignment(Qt.AlignCenter)
+        desc_label.setWordWrap(True)
+        layout.addWidget(desc_label)
+        
+        # Botón para seleccionar archivo PDF
+        self.select_button = QPushButton("Seleccionar PDF")
+        self.select_button.clicked.connect(self.select_pdf)
+        self.select_button.setStyleSheet("font-size: 14px; padding: 10px; margin: 10px;")
+        layout.addWidget(self.select_button)
+        
+        # Botón para seleccionar varios archivos PDF
+        self.select_multiple_button = QPushButton("Seleccionar Múltiples PDFs")
+        self.select_multiple_button.clicked.connect(self.select_multiple_pdfs)
+        self.select_multiple_button.setStyleSheet("font-size: 14px; padding: 10px; margin: 10px;")
+        layout.addWidget(self.select_multiple_button)
+        
+        # Etiqueta para mostrar archivo seleccionado
+        self.file_label = QLabel("Ningún archivo seleccionado")
+        self.file_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.file_label)
+        
+        # Barra de progreso
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+        
+        # Botón para cancelar el lote en curso
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.clicked.connect(self.cancel_batch)
+        self.cancel_button.setEnabled(False)
+        layout.addWidget(self.cancel_button)
+        
+        # Etiqueta para mostrar el estado
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status_label)
+        
+        # Panel de resultados y advertencias (no bloquea el proceso)
+        self.results_panel = QPlainTextEdit()
+        self.results_panel.setReadOnly(True)
+        self.results_panel.setPlaceholderText("Aquí se mostrarán los resultados de cada archivo")
+        layout.addWidget(self.results_panel)
+        
+        # Botón para ver el archivo Excel
+        self.view_excel_button = QPushButton("Ver Archivo Excel")
+        self.view_excel_button.clicked.connect(self.open_excel)
+        self.view_excel_button.setStyleSheet("font-size: 14px; padding: 10px; margin: 10px;")
+        layout.addWidget(self.view_excel_button)
+
+        # Información del creador
+        creator_label = QLabel("Creador: Camilo Zavala - C1ZC<br>"
+                                "Portafolio: <a href='https://c1zc.github.io/CamiloZavala/'>https://c1zc.github.io/CamiloZavala/</a>")
+        creator_label.setAlignment(Qt.AlignCenter)
+        creator_label.setOpenExternalLinks(True)  # Permitir abrir el enlace en el navegador
+        creator_label.setStyleSheet("font-size: 12px; margin: 10px; color: gray;")
+        layout.addWidget(creator_label)
+        
+        # Espaciador
+        layout.addStretch()
+
+    def select_pdf(self):
+        """Abre un diálogo para seleccionar un archivo PDF"""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Seleccionar PDF", "", "PDF Files (*.pdf)")
+        if file_path:
+            self.file_label.setText(f"Archivo seleccionado: {os.path.basename(file_path)}")
+            self.process_pdf(file_path)
+
+    def select_multiple_pdfs(self):
+        """Abre un diálogo para seleccionar múltiples archivos PDF"""
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Seleccionar PDFs", "", "PDF Files (*.pdf)")
+        if file_paths:
+            self.file_label.setText(f"Archivos seleccionados: {len(file_paths)}")
+            self.process_multiple_pdfs(file_paths)
+
+    def process_multiple_pdfs(self, file_paths):
+        """Procesa múltiples archivos PDF"""
+        if not file_paths:
+            return
+        self.start_batch(file_paths)
+
+    def process_pdf(self, pdf_path):
+        """Procesa un solo archivo PDF"""
+        if not pdf_path:
+            return
+        self.status_label.setText("Procesando PDF...")
+        self.start_batch([pdf_path])
+
+    def start_batch(self, file_paths):
+        """Lanza el procesamiento en un hilo de trabajo"""
+        if self.worker is not None:
+            return
+            
+        self.results_panel.clear()
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, len(file_paths))
+        self.progress_bar.setValue(0)
+        self.set_running(True)
+        
+        templates_path = default_templates_path(self.output_file)
+        if templates_path:
+            try:
+                load_templates(templates_path)
+            except (OSError, ValueError) as e:
+                self.results_panel.appendPlainText(f"No se pudieron cargar las plantillas: {str(e)}")
+                templates_path = None
+
+        workers = self.workers if len(file_paths) > 1 else 1
+        self.worker = BatchWorker(file_paths, self.output_file, self.rut_index,
+                                  workers=workers, checkpoint_every=self.checkpoint_every,
+                                  client_bbox=self.client_bbox,
+                                  cache_path=default_cache_path(self.output_file),
+                                  templates_path=templates_path)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.file_done.connect(self.on_file_done)
+        self.worker.warning.connect(self.on_warning)
+        self.worker.stats_ready.connect(self.results_panel.appendPlainText)
+        self.worker.batch_finished.connect(self.on_batch_finished)
+        self.worker.start()
+
+    def cancel_batch(self):
+        """Cancela el lote en curso después del archivo actual"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelando...")
+
+    def set_running(self, running):
+        self.select_button.setEnabled(not running)
+        self.select_multiple_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def on_progress(self, done, total):
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"Procesando... {done} de {total}")
+
+    def on_file_done(self, pdf_path, result):
+        self.results_panel.appendPlainText(f"{os.path.basename(pdf_path)}: {RESULT_LABELS.get(result, result)}")
+
+    def on_warning(self, pdf_path, message):
+        self.results_panel.appendPlainText(f"{os.path.basename(pdf_path)}: Advertencia: {message}")
+
+    def on_batch_finished(self, counts, saved):
+        total = len(self.worker.file_paths)
+        self.worker.wait()
+        self.worker = None
+        self.set_running(False)
+        self.progress_bar.setVisible(False)
+        
+        if not saved:
+            self.status_label.setText("Error al guardar el archivo Excel")
+        elif total == 1 and sum(counts.values()) == 1:
+            if counts["success"]:
+                self.status_label.setText("¡Datos extraídos y guardados con éxito!")
+            elif counts["duplicate"]:
+                self.status_label.setText("Cliente ya existe en la base de datos. No se agregó.")
+            elif counts["invalid_rut"]:
+                self.status_label.setText("El RUT del cliente tiene un dígito verificador inválido. No se agregó.")
+            else:
+                self.status_label.setText("No se pudieron extraer todos los datos requeridos")
+        else:
+            self.status_label.setText(f"Proceso completado: {counts['success']} archivos procesados, "
+                                     f"{counts['duplicate']} duplicados, "
+                                     f"{counts['invalid_rut']} con RUT inválido, "
+                                     f"{counts['error']} con errores")
+
+    def closeEvent(self, event):
+        # No cerrar la ventana con un lote a medio escribir
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
+
+    def open_excel(self):
+        """Abre el archivo Excel con la aplicación predeterminada"""
+        if not os.path.exists(self.output_file):
+            QMessageBox.information(self, "Información", "El archivo Excel aún no ha sido creado.")
+            return
+            
+        # Abrir el archivo con la aplicación predeterminada
+        try:
+            if sys.platform == 'win32':
+                os.startfile(self.output_file)
+            elif sys.platform == 'darwin':  # macOS
+                os.system(f'open "{self.output_file}"')
+            else:  # Linux y otros
+                os.system(f'xdg-open "{self.output_file}"')
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al abrir el archivo Excel: {str(e)}")
+
+
+def main():
+    app = QApplication(sys.argv)
+    window = PDFExtractorApp()
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,184 @@
+"""Métricas por etapa del procesamiento de facturas.
+
+Cada archivo procesado genera una entrada con sus tiempos por etapa
+(texto, campos, duplicados, guardado), páginas leídas, bytes, si vino de la
+caché, el nivel de extracción usado, la plantilla reconocida y el resultado. Las entradas se pueden escribir como líneas JSON y al
+final se resumen con los percentiles 50 y 95 de cada etapa.
+"""
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from array import array
+
+STAGES = ("texto", "campos", "duplicados", "guardado")
+
+
+def percentile(values, fraction):
+    """Percentil por el método del rango más cercano"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def new_file_entry(pdf_path, size=None):
+    """Entrada vacía de métricas para un archivo"""
+    return {
+        "archivo": pdf_path,
+        "bytes": size,
+        "paginas": None,
+        "paginas_total": None,
+        "cache": False,
+        "nivel": None,
+        "productor": None,
+        "plantilla": None,
+        "etapas": {},
+        "resultado": None,
+    }
+
+
+class RunMetrics:
+    """Acumula las métricas de una ejecución y, si se indica, las escribe en JSON lines"""
+
+    def __init__(self, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+        self.files = 0
+        self.cache_hits = 0
+        self.pages = 0
+        self.bytes = 0
+        self.results = {}
+        self.tiers = {}
+        self.templates = {}
+        # array de dobles: 8 bytes por medición, para lotes de decenas de miles de archivos
+        self.stage_times = {stage: array("d") for stage in STAGES}
+        self.run_times = {}
+        self._start = time.perf_counter()
+        self._out = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+
+    def record(self, entry):
+        """Registra la entrada de un archivo ya procesado"""
+        self.files += 1
+        self.cache_hits += bool(entry["cache"])
+        self.pages += entry["paginas"] or 0
+        self.bytes += entry["bytes"] or 0
+        self.results[entry["resultado"]] = self.results.get(entry["resultado"], 0) + 1
+        if entry["nivel"]:
+            self.tiers[entry["nivel"]] = self.tiers.get(entry["nivel"], 0) + 1
+        if entry["plantilla"]:
+            self.templates[entry["plantilla"]] = self.templates.get(entry["plantilla"], 0) + 1
+        for stage, seconds in entry["etapas"].items():
+            self.stage_times.setdefault(stage, array("d")).append(seconds)
+        if self._out is not None:
+            self._out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def add_run_time(self, name, seconds):
+        """Suma el tiempo de una operación de toda la ejecución (p. ej. guardar el Excel)"""
+        self.run_times[name] = self.run_times.get(name, 0.0) + seconds
+
+    def summary(self):
+        elapsed = time.perf_counter() - self._start
+        return {
+            "archivos": self.files,
+            "segundos": elapsed,
+            "archivos_por_s": self.files / elapsed if elapsed else 0.0,
+            "resultados": dict(self.results),
+            "cache_hits": self.cache_hits,
+            "niveles": dict(self.tiers),
+            "plantillas": dict(self.templates),
+            "paginas": self.pages,
+            "bytes": self.bytes,
+            "etapas": {
+                stage: {
+                    "n": len(values),
+                    "total_s": sum(values),
+                    "p50_ms": 1000 * percentile(values, 0.50),
+                    "p95_ms": 1000 * percentile(values, 0.95),
+                }
+                for stage, values in self.stage_times.items() if values
+            },
+            "operaciones_s": dict(self.run_times),
+        }
+
+    def format_summary(self):
+        """Resumen legible de la ejecución"""
+        summary = self.summary()
+        lines = [f"{summary['archivos']} archivos en {summary['segundos']:.2f} s "
+                 f"({summary['archivos_por_s']:.1f} archivos/s), "
+                 f"{summary['cache_hits']} desde la caché, {summary['paginas']} páginas leídas"]
+        if summary["niveles"]:
+            lines.append("extracción: " + ", ".join(
+                f"{count} {tier}" for tier, count in sorted(summary["niveles"].items())))
+        if summary["plantillas"]:
+            lines.append("plantillas: " + ", ".join(
+                f"{count} {name}" for name, count in sorted(summary["plantillas"].items())))
+        if summary["etapas"]:
+            lines.append(f"{'etapa':<12} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+            for stage, values in summary["etapas"].items():
+                lines.append(f"{stage:<12} {values['p50_ms']:9.2f} {values['p95_ms']:9.2f} "
+                             f"{values['total_s']:9.2f}")
+        for name, seconds in summary["operaciones_s"].items():
+            lines.append(f"{name}: {seconds:.2f} s")
+        return "\n".join(lines)
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+
+class Profiler:
+    """Captura opcional de un lote con cProfile y/o tracemalloc.
+
+    cProfile solo ve el proceso principal: para perfilar la extracción hay
+    que procesar con un solo worker.
+    """
+
+    def __init__(self, profile_path=None, trace_memory=False, top=15):
+        self.profile_path = profile_path
+        self.trace_memory = trace_memory
+        self.top = top
+        self._profile = None
+        self._snapshot = None
+        self._peak = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile_path:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.profile_path)
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+            self._peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def report(self):
+        """Texto con las funciones más costosas y las mayores asignaciones de memoria"""
+        parts = []
+        if self._profile is not None:
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(self.top)
+            parts.append(f"Perfil guardado en {self.profile_path}\n{stream.getvalue().strip()}")
+        if self._snapshot is not None:
+            lines = [f"Memoria máxima (tracemalloc): {self._peak / 2**20:.1f} MB"]
+            for stat in self._snapshot.statistics("lineno")[:self.top]:
+                lines.append(str(stat))
+            parts.append("\n".join(lines))
+        return "\n\n".join(parts)
@@ -0,0 +1,83 @@
+"""Normalización y validación de RUT chilenos.
+
+Un RUT se compone de un cuerpo numérico y un dígito verificador (0-9 o K)
+calculado con el algoritmo módulo 11. Las facturas lo traen con o sin puntos
+y con o sin guion; aquí se reduce a una forma canónica para comparar
+(`normalize_rut`, 12345678-9) y a la forma con puntos que se guarda en el
+Excel (`format_rut`, 12.345.678-9).
+
+Las funciones `*_many` procesan listas completas de una vez, para importar
+o revisar planillas grandes sin pasar celda por celda.
+"""
+import re
+
+NON_RUT_CHAR_RE = re.compile(r'[^0-9K]')
+
+# Dígito verificador según el resto de la suma ponderada (11 - resto)
+_CHECK_DIGITS = "0123456789K0"
+
+
+def _clean(rut):
+    """Solo los dígitos y la K del RUT, en mayúsculas"""
+    return NON_RUT_CHAR_RE.sub('', str(rut).upper())
+
+
+def check_digit(body):
+    """Dígito verificador (módulo 11) del cuerpo numérico de un RUT"""
+    total = 0
+    factor = 2
+    for digit in reversed(body):
+        total += (ord(digit) - 48) * factor
+        factor = 2 if factor == 7 else factor + 1
+    return _CHECK_DIGITS[11 - total % 11]
+
+
+def normalize_rut(rut):
+    """Normaliza un RUT a la forma 12345678-9 para poder compararlo.
+
+    Acepta el formato con puntos (12.345.678-9), sin puntos o sin guion.
+    Devuelve None si no hay al menos un cuerpo y un dígito verificador.
+    """
+    if rut is None:
+        return None
+    clean_rut = _clean(rut)
+    if len(clean_rut) < 2 or not clean_rut[:-1].isdigit():
+        return None
+    cuerpo_rut = clean_rut[:-1].lstrip('0') or '0'
+    return f"{cuerpo_rut}-{clean_rut[-1]}"
+
+
+def is_valid(rut):
+    """Indica si el RUT tiene un dígito verificador correcto"""
+    normalized = normalize_rut(rut)
+    if normalized is None:
+        return False
+    body, digit = normalized.split("-")
+    return check_digit(body) == digit
+
+
+def format_rut(rut):
+    """Da formato 12.345.678-9 a un RUT; None si no se puede normalizar"""
+    normalized = normalize_rut(rut)
+    if normalized is None:
+        return None
+    body, digit = normalized.split("-")
+    return f"{int(body):,}".replace(",", ".") + f"-{digit}"
+
+
+def normalize_many(ruts):
+    """`normalize_rut` sobre una secuencia de RUT; devuelve una lista"""
+    return [normalize_rut(rut) for rut in ruts]
+
+
+def validate_many(ruts):
+    """Para cada RUT de la secuencia, True si su dígito verificador es correcto"""
+    valid = []
+    append = valid.append
+    for normalized in normalize_many(ruts):
+        if normalized is None:
+            append(False)
+        else:
+            body, digit = normalized.split("-")
+            append(check_digit(body) == digit)
+    return valid
@@ -0,0 +1,853 @@
+"""Almacenamiento de los clientes extraídos.
+
+Hay tres implementaciones con la misma interfaz (`exists`, `add`,
+`checkpoint`, `flush`, `close`). `checkpoint` deja las filas pendientes a
+salvo en disco de la forma más barata posible y `flush` además las lleva al
+Excel:
+
+- `ExcelStorage`: el archivo Excel es la base de datos (comportamiento
+  original de la aplicación). Las filas nuevas pasan por fragmentos y se
+  consolidan al volcar, sin cargar la hoja completa.
+- `SQLiteStorage`: los clientes se guardan en SQLite, con un índice único
+  sobre el RUT normalizado, y el Excel se genera como exportación.
+- `ShardStorage`: cada proceso escribe sus propios fragmentos y
+  `merge_shards` los consolida en el Excel, para varios usuarios sobre el
+  mismo archivo en una carpeta compartida.
+
+Toda escritura del Excel se hace con el candado `<archivo>.lock` (ver
+`FileLock`), de modo que dos procesos no se pisen al guardarlo. El Excel se
+lee en modo de solo lectura y, si no tiene otras hojas ni formato, se
+reescribe fila por fila en modo de solo escritura, así la memoria no crece
+con el tamaño de la hoja.
+"""
+import itertools
+import json
+import logging
+import os
+import re
+import socket
+import sqlite3
+import stat
+import tempfile
+import time
+import uuid
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+
+from .rut import format_rut, normalize_many, normalize_rut, validate_many
+
+# Columnas del archivo Excel, en el mismo orden que el diccionario de datos extraído
+FIELDS = (
+    "Razón social",
+    "RUT",
+    "Giro",
+    "Dirección",
+    "Comuna",
+    "Ciudad",
+    "Nombre contacto",
+    "Teléfono",
+)
+
+logger = logging.getLogger(__name__)
+
+# Filas que se normalizan juntas al leer la columna RUT
+NORMALIZE_CHUNK = 10000
+
+
+def replacement_mode(path):
+    """Permisos para el archivo que reemplaza a `path`.
+
+    mkstemp crea los temporales solo legibles por su dueño; el reemplazo
+    conserva los permisos del original o, si es nuevo, los que daría la
+    umask, para que los demás usuarios de una carpeta compartida lo sigan
+    pudiendo leer y escribir.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def save_workbook_atomic(wb, path):
+    """Guarda en un temporal del mismo directorio y reemplaza el original"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".xlsx", dir=directory)
+    os.close(fd)
+    try:
+        wb.save(tmp_path)
+        os.chmod(tmp_path, replacement_mode(path))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class FileLock:
+    """Candado entre procesos basado en un archivo creado en forma exclusiva.
+
+    Sirve también entre equipos que comparten la carpeta por red, donde no
+    hay bloqueos de archivo portables. Un candado con más de `stale_after`
+    segundos se da por abandonado (un proceso que terminó sin liberarlo) y
+    se reemplaza. Si no se obtiene en `timeout` segundos se lanza TimeoutError.
+
+    Cada candado lleva una marca única de quien lo tiene. Solo se quita uno
+    abandonado si la marca sigue siendo la que se vio vencida, y `release`
+    solo quita el candado propio, así un proceso lento no borra el de otro.
+    """
+
+    def __init__(self, path, timeout=60.0, stale_after=600.0, poll_interval=0.2):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        # Quién tiene el candado, para poder diagnosticar uno abandonado
+        self.token = f"{socket.gethostname()} {os.getpid()} {uuid.uuid4().hex}"
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._is_stale(self.path):
+                    owner = self._read_owner()
+                    if owner is not None and self._break_stale(owner):
+                        continue
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Otro proceso tiene el candado {self.path}")
+                time.sleep(self.poll_interval)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.token + "\n")
+            return
+
+    def _break_stale(self, owner):
+        """Quita el candado abandonado de `owner`; True si se quitó.
+
+        La comprobación y el borrado se hacen con un segundo candado
+        (`<candado>.break`), de modo que si dos procesos ven el mismo candado
+        vencido solo uno lo quita y el otro no borra el que aquel acaba de crear.
+        """
+        breaker = self.path + ".break"
+        try:
+            fd = os.open(breaker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # Otro proceso lo está reemplazando; si murió en medio, se libera
+            if self._is_stale(breaker):
+                try:
+                    os.remove(breaker)
+                except FileNotFoundError:
+                    pass
+            return False
+        os.close(fd)
+        try:
+            if self._read_owner() != owner or not self._is_stale(self.path):
+                return False
+            os.remove(self.path)
+            return True
+        except FileNotFoundError:
+            return True
+        finally:
+            os.remove(breaker)
+
+    def _read_owner(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _is_stale(self, path):
+        try:
+            return time.time() - os.path.getmtime(path) > self.stale_after
+        except FileNotFoundError:
+            return False
+
+    def release(self):
+        # Si el candado se dio por abandonado y ya es de otro proceso, no se toca
+        if self._read_owner() == self.token:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def lock_path(path):
+    """Archivo de candado que protege las escrituras de `path`"""
+    return path + ".lock"
+
+
+class RutIndex:
+    """Índice en memoria de los RUT guardados en el archivo Excel.
+
+    El libro se lee una sola vez y solo se vuelve a cargar si cambia la
+    fecha de modificación o el tamaño del archivo, de modo que la
+    verificación de duplicados es O(1) y no abre el Excel en cada consulta.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._ruts = set()
+        self._pending = set()
+        self._signature = None
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        """Recarga el índice si el archivo cambió desde la última lectura"""
+        if not os.path.exists(self.path):
+            self._ruts = set()
+            self._signature = None
+            return
+
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        ruts = set()
+        wb = load_workbook(self.path, read_only=True)
+        try:
+            ws = wb.active
+            header = next(ws.iter_rows(max_row=1, values_only=True), None) or ()
+
+            # Solo se lee la columna RUT, normalizada por bloques
+            if "RUT" in header:
+                column = header.index("RUT") + 1
+                values = (value for (value,) in ws.iter_rows(
+                    min_row=2, min_col=column, max_col=column, values_only=True))
+                while True:
+                    chunk = list(itertools.islice(values, NORMALIZE_CHUNK))
+                    if not chunk:
+                        break
+                    ruts.update(normalize_many(chunk))
+                ruts.discard(None)
+        finally:
+            wb.close()
+
+        self._ruts = ruts
+        self._signature = signature
+
+    def add(self, rut):
+        """Registra un RUT que se guardará en la próxima consolidación en el archivo"""
+        rut = normalize_rut(rut)
+        if rut:
+            self._pending.add(rut)
+
+    def reset(self, ruts):
+        """Reemplaza el índice por los RUT que quedaron en el archivo recién escrito.
+
+        Se llama con el candado tomado, así la firma corresponde a ese archivo
+        y no a uno que otro proceso haya escrito después. Los pendientes ya
+        están en `ruts`, agregados o descartados como duplicados.
+        """
+        self._ruts = set(ruts)
+        self._pending.clear()
+        if os.path.exists(self.path):
+            self._signature = self._file_signature()
+
+    def invalidate(self):
+        """Fuerza a releer el archivo en la próxima consulta"""
+        self._signature = None
+
+    def __contains__(self, rut):
+        self.refresh()
+        rut = normalize_rut(rut)
+        return rut in self._ruts or rut in self._pending
+
+
+def default_shard_dir(path):
+    """Carpeta de fragmentos de un Excel de clientes: <nombre>_fragmentos"""
+    return os.path.splitext(path)[0] + "_fragmentos"
+
+
+def list_shards(shard_dir):
+    """Fragmentos completos de la carpeta, del más antiguo al más nuevo"""
+    try:
+        entries = [entry for entry in os.scandir(shard_dir)
+                   if entry.is_file() and entry.name.endswith(".jsonl")]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: (entry.stat().st_mtime_ns, entry.name))
+    return [entry.path for entry in entries]
+
+
+def read_shard(path):
+    """Filas (diccionarios campo -> valor) de un fragmento"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ShardWriter:
+    """Escribe fragmentos con un nombre único por equipo y proceso.
+
+    Cada fragmento se escribe en un temporal y se renombra, así nunca queda
+    uno a medias aunque el proceso se interrumpa.
+    """
+
+    def __init__(self, shard_dir):
+        self.shard_dir = shard_dir
+        self._prefix = f"{socket.gethostname()}-{os.getpid()}-{time.strftime('%Y%m%d%H%M%S')}"
+        self._sequence = 0
+
+    def write(self, rows):
+        """Escribe las filas (diccionarios campo -> valor) como un fragmento nuevo"""
+        # La carpeta se borra al consolidar si queda vacía
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self._sequence += 1
+        name = f"{self._prefix}-{self._sequence:05d}.jsonl"
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.shard_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for data in rows:
+                    f.write(json.dumps({field: data.get(field) for field in FIELDS},
+                                       ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            # Legible por los demás procesos que consolidan la carpeta compartida
+            target = os.path.join(self.shard_dir, name)
+            os.chmod(tmp_path, replacement_mode(target))
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+# Marcas de la hoja que un libro regenerado en modo de solo escritura perdería:
+# anchos de columna, paneles inmovilizados, celdas combinadas, filtros, formatos
+# condicionales, validaciones, vínculos, tablas, dibujos y filas con alto propio,
+# ocultas o agrupadas
+_SHEET_FEATURES = (b"<cols", b"<pane", b"<mergeCell", b"<autoFilter",
+                   b"<conditionalFormatting", b"<dataValidation", b"<hyperlink",
+                   b"<tablePart", b"<drawing", b"<legacyDrawing", b"customHeight",
+                   b'hidden="1"', b'outlineLevel="')
+_CELL_XFS_RE = re.compile(rb'<cellXfs count="(\d+)"')
+
+
+def _is_plain_workbook(path):
+    """Indica si el libro se puede regenerar fila por fila sin perder nada.
+
+    Es así cuando tiene una sola hoja, sin nombres definidos, sin más estilo
+    que el predeterminado y sin ninguna de las marcas de `_SHEET_FEATURES`,
+    como el Excel que genera la propia aplicación. Se revisa el contenido del
+    archivo sin interpretarlo como libro; ante la duda, la respuesta es False.
+    """
+    try:
+        with zipfile.ZipFile(path) as z:
+            names = z.namelist()
+            workbook = z.read("xl/workbook.xml")
+            if workbook.count(b"<sheet ") != 1 or b"<definedName " in workbook:
+                return False
+            if any(name.startswith("xl/worksheets/_rels/") for name in names):
+                return False
+            match = _CELL_XFS_RE.search(z.read("xl/styles.xml"))
+            if match is None or int(match.group(1)) > 1:
+                return False
+            sheets = [name for name in names
+                      if name.startswith("xl/worksheets/") and name.endswith(".xml")]
+            if len(sheets) != 1:
+                return False
+            overlap = max(len(feature) for feature in _SHEET_FEATURES)
+            tail = b""
+            with z.open(sheets[0]) as f:
+                while True:
+                    chunk = f.read(1 << 20)
+                    if not chunk:
+                        return True
+                    window = tail + chunk
+                    if any(feature in window for feature in _SHEET_FEATURES):
+                        return False
+                    tail = window[-overlap:]
+    except (KeyError, zipfile.BadZipFile):
+        return False
+
+
+def _append_shard_rows(ws, header, shards, seen, summary):
+    """Agrega a la hoja las filas de los fragmentos cuyo RUT no está en `seen`"""
+    for shard in shards:
+        for data in read_shard(shard):
+            rut = normalize_rut(data.get("RUT"))
+            if rut in seen:
+                summary["duplicados"] += 1
+                continue
+            seen.add(rut)
+            ws.append([data.get(column) for column in header])
+            summary["agregados"] += 1
+
+
+def _merge_streaming(path, shards, summary):
+    """Regenera el libro fila por fila con los fragmentos al final; devuelve los RUT"""
+    out = Workbook(write_only=True)
+    seen = set()
+    if os.path.exists(path):
+        wb = load_workbook(path, read_only=True)
+        try:
+            source = wb.active
+            ws = out.create_sheet(source.title)
+            rows = source.iter_rows(values_only=True)
+            header = next(rows, None) or FIELDS
+            ws.append(header)
+            rut_column = header.index("RUT") if "RUT" in header else None
+            for row in rows:
+                ws.append(row)
+                if rut_column is not None and rut_column < len(row):
+                    seen.add(normalize_rut(row[rut_column]))
+        finally:
+            wb.close()
+    else:
+        ws = out.create_sheet()
+        header = FIELDS
+        ws.append(header)
+    _append_shard_rows(ws, header, shards, seen, summary)
+    save_workbook_atomic(out, path)
+    return seen
+
+
+def _merge_in_place(path, shards, summary):
+    """Carga el libro completo y agrega los fragmentos a la hoja activa; devuelve los RUT.
+
+    Conserva las demás hojas y el formato, a cambio de tener todo el libro
+    en memoria mientras se guarda.
+    """
+    wb = load_workbook(path)
+    ws = wb.active
+    header = next(ws.iter_rows(max_row=1, values_only=True), None)
+    if not header or not any(header):
+        header = FIELDS
+        ws.append(header)
+    seen = set()
+    if "RUT" in header:
+        column = header.index("RUT") + 1
+        seen.update(normalize_many(
+            value for (value,) in ws.iter_rows(min_row=2, min_col=column, max_col=column,
+                                               values_only=True)))
+    _append_shard_rows(ws, header, shards, seen, summary)
+    save_workbook_atomic(wb, path)
+    return seen
+
+
+def merge_shards(path, shard_dir=None, lock_timeout=60.0, rut_index=None):
+    """Consolida los fragmentos en el Excel de clientes con una sola escritura.
+
+    Bajo el candado del Excel, se agregan las filas de los fragmentos cuyo RUT
+    normalizado no esté ya guardado (la primera aparición gana) y luego se
+    borran los fragmentos consolidados. Si el proceso se interrumpe antes de
+    borrarlos, la próxima consolidación los descarta como duplicados.
+
+    Si el libro es el de la aplicación (ver `_is_plain_workbook`), las filas
+    existentes pasan en streaming de un libro de solo lectura a uno de solo
+    escritura, así la memoria no depende del tamaño de la hoja. Un libro con
+    otras hojas o con formato se carga completo y se guarda con las filas
+    agregadas, para no perder nada. En ambos casos se reescribe el archivo
+    entero, de modo que cada consolidación tarda según el tamaño de la hoja.
+    Si se indica `rut_index`, queda con los RUT del archivo consolidado, que
+    se leyeron en la misma pasada.
+
+    Devuelve un diccionario con los fragmentos leídos y las filas agregadas y
+    duplicadas.
+    """
+    shard_dir = shard_dir or default_shard_dir(path)
+    summary = {"fragmentos": 0, "agregados": 0, "duplicados": 0}
+    with FileLock(lock_path(path), timeout=lock_timeout):
+        shards = list_shards(shard_dir)
+        if not shards:
+            return summary
+
+        if not os.path.exists(path) or _is_plain_workbook(path):
+            seen = _merge_streaming(path, shards, summary)
+        else:
+            logger.debug("%s tiene otras hojas o formato, se guarda sin regenerarlo", path)
+            seen = _merge_in_place(path, shards, summary)
+
+        for shard in shards:
+            os.remove(shard)
+        try:
+            os.rmdir(shard_dir)
+        except OSError:
+            # Quedan fragmentos nuevos de otro proceso
+            pass
+        summary["fragmentos"] = len(shards)
+        if rut_index is not None:
+            seen.discard(None)
+            rut_index.reset(seen)
+    return summary
+
+
+class ExcelBatchWriter:
+    """Sesión de escritura por lotes sobre el archivo Excel.
+
+    Las filas nuevas se acumulan en memoria. Cada `checkpoint_every` filas se
+    guardan como un fragmento junto al Excel (ver `ShardWriter`), una
+    escritura pequeña que no toca el libro. `flush` consolida en el Excel
+    todos los fragmentos de la carpeta con `merge_shards`, bajo el candado del
+    archivo, incluidos los que dejó una ejecución interrumpida; las filas cuyo
+    RUT ya guardó otro proceso se descartan. Si la consolidación falla, las
+    filas quedan en los fragmentos y se vuelve a intentar en el próximo
+    `flush`.
+    """
+
+    def __init__(self, path, rut_index=None, checkpoint_every=None, lock_timeout=60.0,
+                 shard_dir=None):
+        self.path = path
+        self.rut_index = rut_index
+        self.checkpoint_every = checkpoint_every
+        self.lock_timeout = lock_timeout
+        self.shard_dir = shard_dir or default_shard_dir(path)
+        self._shards = ShardWriter(self.shard_dir)
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def add(self, data):
+        """Agrega una fila al búfer y guarda un fragmento si corresponde"""
+        self._rows.append(data)
+        if self.rut_index is not None:
+            self.rut_index.add(data["RUT"])
+        if self.checkpoint_every and len(self._rows) >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Guarda las filas del búfer en un fragmento, sin reescribir el Excel"""
+        if not self._rows:
+            return
+        # Los RUT siguen pendientes en el índice hasta consolidarlos en el Excel
+        self._shards.write(self._rows)
+        self._rows = []
+
+    def flush(self):
+        """Escribe las filas pendientes en el Excel de forma atómica"""
+        self.checkpoint()
+        # También los fragmentos que dejó una ejecución interrumpida
+        if list_shards(self.shard_dir):
+            merge_shards(self.path, self.shard_dir, self.lock_timeout, self.rut_index)
+
+    def close(self):
+        """Vuelca lo pendiente"""
+        self.flush()
+
+
+class ExcelStorage:
+    """Clientes guardados directamente en el archivo Excel"""
+
+    def __init__(self, path, rut_index=None, checkpoint_every=None, lock_timeout=60.0,
+                 shard_dir=None):
+        self.path = path
+        self.rut_index = rut_index if rut_index is not None else RutIndex(path)
+        self.writer = ExcelBatchWriter(path, self.rut_index, checkpoint_every=checkpoint_every,
+                                       lock_timeout=lock_timeout, shard_dir=shard_dir)
+
+    def exists(self, rut):
+        return rut in self.rut_index
+
+    def add(self, data):
+        self.writer.add(data)
+
+    def checkpoint(self):
+        self.writer.checkpoint()
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+class ShardStorage:
+    """Clientes escritos en fragmentos propios del proceso y consolidados en el Excel.
+
+    Cada volcado escribe un fragmento nuevo (una línea JSON por cliente) en
+    `shard_dir`, con un nombre único por equipo y proceso. El fragmento se
+    escribe en un temporal y se renombra, así nunca hay uno a medias y varios
+    procesos, incluso en distintos equipos sobre una carpeta compartida,
+    agregan clientes sin escribir el mismo archivo. Al cerrar se consolida
+    con `merge_shards` (salvo `merge_on_close=False`); si otro proceso tiene
+    el candado por más de `lock_timeout` segundos, los fragmentos quedan para
+    la próxima consolidación.
+    """
+
+    def __init__(self, path, shard_dir=None, rut_index=None, checkpoint_every=None,
+                 merge_on_close=True, lock_timeout=60.0):
+        self.path = path
+        self.shard_dir = shard_dir or default_shard_dir(path)
+        self.rut_index = rut_index if rut_index is not None else RutIndex(path)
+        self.checkpoint_every = checkpoint_every
+        self.merge_on_close = merge_on_close
+        self.lock_timeout = lock_timeout
+        self.merge_summary = None
+        self._writer = ShardWriter(self.shard_dir)
+        self._pending = {}
+        # RUT de los fragmentos sin consolidar, propios o de otros procesos
+        self._shard_ruts = None
+
+    def _load_shard_ruts(self):
+        if self._shard_ruts is None:
+            self._shard_ruts = set()
+            for shard in list_shards(self.shard_dir):
+                try:
+                    self._shard_ruts.update(normalize_rut(data.get("RUT")) for data in read_shard(shard))
+                except FileNotFoundError:
+                    # Otro proceso lo consolidó mientras se leía
+                    continue
+
+    def exists(self, rut):
+        rut = normalize_rut(rut)
+        if rut in self._pending:
+            return True
+        self._load_shard_ruts()
+        return rut in self._shard_ruts or rut in self.rut_index
+
+    def add(self, data):
+        self._pending[normalize_rut(data["RUT"])] = data
+        if self.checkpoint_every and len(self._pending) >= self.checkpoint_every:
+            self.flush()
+
+    def flush(self):
+        """Escribe las filas pendientes como un fragmento nuevo"""
+        if not self._pending:
+            return
+        self._writer.write(self._pending.values())
+        self._load_shard_ruts()
+        self._shard_ruts.update(self._pending)
+        self._pending.clear()
+
+    def checkpoint(self):
+        self.flush()
+
+    def merge(self):
+        """Consolida en el Excel los fragmentos de todos los procesos"""
+        self.flush()
+        self.merge_summary = merge_shards(self.path, self.shard_dir, self.lock_timeout,
+                                          self.rut_index)
+        # Los clientes consolidados ahora están en el Excel
+        self._shard_ruts = None
+        return self.merge_summary
+
+    def close(self):
+        self.flush()
+        if self.merge_on_close:
+            try:
+                self.merge()
+            except TimeoutError as e:
+                logger.warning("%s; los fragmentos quedan en %s para la próxima consolidación",
+                               e, self.shard_dir)
+
+
+def _normalized_rows(rows, column, summary):
+    """Filas a conservar de `rows` (sin el encabezado), con los RUT ya formateados"""
+    seen = set()
+    while True:
+        chunk = list(itertools.islice(rows, NORMALIZE_CHUNK))
+        if not chunk:
+            break
+        chunk = [row for row in chunk if any(value is not None for value in row)]
+        values = [row[column] if column < len(row) else None for row in chunk]
+        normalized = normalize_many(values)
+        for row, rut, valid in zip(chunk, normalized, validate_many(normalized)):
+            summary["filas"] += 1
+            if rut is None:
+                summary["sin_rut"] += 1
+                yield row
+                continue
+            if rut in seen:
+                summary["duplicados"] += 1
+                continue
+            seen.add(rut)
+            if not valid:
+                summary["invalidos"] += 1
+                if len(summary["ejemplos_invalidos"]) < 20:
+                    summary["ejemplos_invalidos"].append(row[column])
+            row = list(row) + [None] * (column + 1 - len(row))
+            row[column] = format_rut(rut)
+            yield row
+
+
+def _rut_column(header, path):
+    if header is None or "RUT" not in header:
+        raise ValueError(f"{path} no tiene una columna RUT")
+    return header.index("RUT")
+
+
+def normalize_workbook(path, output=None, lock_timeout=60.0):
+    """Pasada única sobre un Excel de clientes: da formato a los RUT y quita duplicados.
+
+    La columna RUT se normaliza y valida por bloques de `NORMALIZE_CHUNK`
+    filas (ver `rut.normalize_many`). Se conserva la primera fila de cada
+    RUT, con el formato 12.345.678-9, y el resultado se escribe en `output`
+    o, si no se indica, reemplazando `path` bajo su candado. Las filas vacías
+    se omiten; las que no tienen RUT y las de dígito verificador inválido se
+    conservan y se informan.
+
+    Como en `merge_shards`, el libro de la aplicación se lee en modo de solo
+    lectura y se reescribe en modo de solo escritura; uno con otras hojas o
+    con formato se carga completo y se corrige la hoja activa, conservando
+    lo demás.
+
+    Devuelve un diccionario con las filas leídas, duplicados eliminados, RUT
+    inválidos (con algunos ejemplos) y filas sin RUT.
+    """
+    target = output or path
+    summary = {"filas": 0, "duplicados": 0, "invalidos": 0, "sin_rut": 0, "ejemplos_invalidos": []}
+    with FileLock(lock_path(target), timeout=lock_timeout):
+        if not _is_plain_workbook(path):
+            wb = load_workbook(path)
+            ws = wb.active
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            kept = list(_normalized_rows(rows, _rut_column(header, path), summary))
+            # Se reescriben los valores en su lugar, así cada celda conserva su formato
+            width = ws.max_column
+            for row_number, row in enumerate(kept, start=2):
+                for column_number in range(1, width + 1):
+                    value = row[column_number - 1] if column_number <= len(row) else None
+                    # ws.cell(value=None) no borra el valor anterior
+                    ws.cell(row=row_number, column=column_number).value = value
+            extra = ws.max_row - (len(kept) + 1)
+            if extra > 0:
+                ws.delete_rows(len(kept) + 2, extra)
+            save_workbook_atomic(wb, target)
+            return summary
+
+        out = Workbook(write_only=True)
+        wb = load_workbook(path, read_only=True)
+        try:
+            source = wb.active
+            ws = out.create_sheet(source.title)
+            rows = source.iter_rows(values_only=True)
+            header = next(rows, None)
+            column = _rut_column(header, path)
+            ws.append(header)
+            for row in _normalized_rows(rows, column, summary):
+                ws.append(row)
+        finally:
+            wb.close()
+        save_workbook_atomic(out, target)
+    return summary
+
+
+class SQLiteStorage:
+    """Clientes guardados en SQLite, con exportación al Excel de siempre.
+
+    La tabla tiene un índice único sobre el RUT normalizado, por lo que la
+    verificación de duplicados es una búsqueda indexada y varios usuarios
+    pueden escribir a la vez (modo WAL). Las filas nuevas se insertan por
+    lotes; si otro proceso ya insertó el mismo RUT, se conserva el registro
+    existente. Si se indica `export_path`, al cerrar se regenera ese Excel con
+    las mismas columnas, con el candado del archivo. Una base nueva importa
+    primero los clientes que ya hubiera en `export_path`.
+    """
+
+    def __init__(self, db_path, export_path=None, checkpoint_every=None, lock_timeout=60.0):
+        self.db_path = db_path
+        self.export_path = export_path
+        self.checkpoint_every = checkpoint_every
+        self.lock_timeout = lock_timeout
+        self._pending = {}
+        self._conn = sqlite3.connect(db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f'"{field}" TEXT' for field in FIELDS)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS clientes ("
+            f" id INTEGER PRIMARY KEY, rut_normalizado TEXT NOT NULL, {columns})")
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS clientes_rut ON clientes (rut_normalizado)")
+        self._conn.commit()
+
+        if export_path and os.path.exists(export_path) and not len(self):
+            self.import_excel(export_path)
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+
+    def exists(self, rut):
+        rut = normalize_rut(rut)
+        if rut in self._pending:
+            return True
+        return self._conn.execute("SELECT 1 FROM clientes WHERE rut_normalizado = ?",
+                                  (rut,)).fetchone() is not None
+
+    def add(self, data):
+        rut = normalize_rut(data["RUT"])
+        self._pending[rut] = [data.get(field) for field in FIELDS]
+        if self.checkpoint_every and len(self._pending) >= self.checkpoint_every:
+            self.flush()
+
+    def add_many(self, rows):
+        """Inserta filas (listas en el orden de FIELDS) en una sola transacción"""
+        placeholders = ", ".join("?" for _ in range(len(FIELDS) + 1))
+        columns = ", ".join(f'"{field}"' for field in FIELDS)
+        rut_column = FIELDS.index("RUT")
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO clientes (rut_normalizado, {columns}) VALUES ({placeholders})"
+                f" ON CONFLICT (rut_normalizado) DO NOTHING",
+                ([normalize_rut(row[rut_column])] + list(row) for row in rows
+                 if normalize_rut(row[rut_column])))
+
+    def import_excel(self, path):
+        """Carga los clientes de un Excel con las columnas de FIELDS"""
+        wb = load_workbook(path, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            positions = [header.index(field) if field in header else None for field in FIELDS]
+            if positions[FIELDS.index("RUT")] is None:
+                return
+            self.add_many(
+                [row[i] if i is not None and i < len(row) else None for i in positions]
+                for row in rows)
+        finally:
+            wb.close()
+
+    def flush(self):
+        if self._pending:
+            self.add_many(self._pending.values())
+            self._pending.clear()
+
+    def checkpoint(self):
+        self.flush()
+
+    def export_excel(self, path=None):
+        """Genera el Excel de clientes a partir de la base, en modo de solo escritura"""
+        path = path or self.export_path
+        self.flush()
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(FIELDS)
+        columns = ", ".join(f'"{field}"' for field in FIELDS)
+        for row in self._conn.execute(f"SELECT {columns} FROM clientes ORDER BY id"):
+            ws.append(row)
+        with FileLock(lock_path(path), timeout=self.lock_timeout):
+            save_workbook_atomic(wb, path)
+
+    def close(self):
+        if self._conn is None:
+            return
+        try:
+            self.flush()
+            if self.export_path:
+                self.export_excel()
+        finally:
+            self._conn.close()
+            self._conn = None
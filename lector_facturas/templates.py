@@ -0,0 +1,149 @@
+"""Perfiles de extracción por plantilla de emisor.
+
+Las facturas que genera un mismo ERP comparten el diseño: las mismas
+etiquetas, en el mismo orden y en la misma zona de la página. Un perfil
+describe una de esas plantillas (cómo reconocerla y qué etiquetas usa) y se
+compila una sola vez al cargarlo. Con un perfil conocido los campos se buscan
+solo dentro de la sección del cliente, línea por línea, sin la búsqueda
+alternativa del análisis genérico; las facturas que no coinciden con ningún
+perfil siguen pasando por `extractor.extract_data_from_text`.
+
+Los perfiles se leen de un archivo JSON con una lista de objetos:
+
+    [
+      {
+        "nombre": "erp_a",
+        "huella": {"productor": "ERP Facturador A", "rut_emisor": "76.543.210-3"},
+        "seccion": {"inicio": "SEÑOR(ES):", "fin": "FECHA EMISION"},
+        "etiquetas": {"Razón social": "SEÑOR(ES):", "RUT": "R.U.T.:", "Giro": "GIRO:"},
+        "telefono": {"prefijo": "+56 "},
+        "bbox": [0, 0, 612, 260]
+      }
+    ]
+
+La huella puede combinar "productor" (comienzo del metadato Producer del
+PDF), "rut_emisor" (primer RUT del encabezado, antes de la sección del
+cliente) y "encabezado" (texto que aparece en ese encabezado); un perfil se
+aplica cuando coinciden todas las que declara. "bbox" es la región que se lee
+con pdfplumber si la lectura rápida no alcanza (ver `--bbox`).
+"""
+import hashlib
+import json
+import os
+import re
+
+from .rut import normalize_rut
+from .storage import FIELDS
+
+DEFAULT_TEMPLATES_NAME = "plantillas.json"
+DEFAULT_SECTION_START = "SEÑOR(ES):"
+
+ISSUER_RUT_RE = re.compile(r'R\.U\.T\.:?\s*([\d\.]+\s*-?\s*[0-9kK])\b', re.IGNORECASE)
+
+# Perfiles ya compilados por ruta: (firma del archivo, TemplateSet)
+_loaded = {}
+
+
+def default_templates_path(output):
+    """Archivo de plantillas junto al Excel de salida, si existe"""
+    path = os.path.join(os.path.dirname(os.path.abspath(output)), DEFAULT_TEMPLATES_NAME)
+    return path if os.path.exists(path) else None
+
+
+class TemplateProfile:
+    """Perfil compilado de una plantilla de emisor"""
+
+    def __init__(self, config):
+        self.name = config["nombre"]
+        fingerprint = config.get("huella") or {}
+        self.producer = fingerprint.get("productor")
+        self.issuer_rut = normalize_rut(fingerprint["rut_emisor"]) if fingerprint.get("rut_emisor") else None
+        self.header = fingerprint.get("encabezado")
+        if not (self.producer or self.issuer_rut or self.header):
+            raise ValueError(f"La plantilla {self.name} no tiene huella")
+
+        section = config.get("seccion") or {}
+        self.section_start = section.get("inicio", DEFAULT_SECTION_START)
+        self.section_end = section.get("fin")
+
+        labels = config.get("etiquetas") or {}
+        unknown = [field for field in labels if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"La plantilla {self.name} tiene campos desconocidos: {', '.join(unknown)}")
+        if "RUT" not in labels:
+            raise ValueError(f"La plantilla {self.name} no indica la etiqueta del RUT")
+        # Cada etiqueta al comienzo de una línea; el valor es el resto de la línea
+        self.patterns = tuple(
+            (field, re.compile(rf'^[ \t]*{re.escape(label)}[ \t]*(.*?)[ \t]*$',
+                               re.MULTILINE | re.IGNORECASE))
+            for field, label in labels.items())
+
+        self.phone_prefix = (config.get("telefono") or {}).get("prefijo", "+56 ")
+        bbox = config.get("bbox")
+        self.bbox = tuple(float(value) for value in bbox) if bbox else None
+
+    def matches(self, producer, text):
+        """Indica si la factura corresponde a esta plantilla"""
+        if self.producer and not (producer or "").startswith(self.producer):
+            return False
+        if self.issuer_rut or self.header:
+            end = text.find(self.section_start)
+            header = text if end == -1 else text[:end]
+            if self.header and self.header not in header:
+                return False
+            if self.issuer_rut:
+                match = ISSUER_RUT_RE.search(header)
+                if not match or normalize_rut(match.group(1)) != self.issuer_rut:
+                    return False
+        return True
+
+    def section_bounds(self, text):
+        """(inicio, fin) de la sección del cliente en el texto; None si no está"""
+        start = text.find(self.section_start)
+        if start == -1:
+            return None
+        # Desde el comienzo de la línea, para que las etiquetas puedan anclarse con ^
+        start = text.rfind("\n", 0, start) + 1
+        end = text.find(self.section_end, start) if self.section_end else -1
+        return start, len(text) if end == -1 else end
+
+
+class TemplateSet:
+    """Perfiles cargados de un archivo, en el orden en que se prueban"""
+
+    def __init__(self, profiles, digest):
+        self.profiles = profiles
+        # Identifica el contenido del archivo, para las claves de la caché de extracciones
+        self.digest = digest
+
+    def match(self, producer, text):
+        """Primer perfil que coincide con la factura, o None si la plantilla es desconocida"""
+        for profile in self.profiles:
+            if profile.matches(producer, text):
+                return profile
+        return None
+
+
+def load_templates(path):
+    """Carga y compila los perfiles de `path`.
+
+    Los perfiles compilados se reutilizan mientras el archivo no cambie, así
+    cada proceso del pool los compila una sola vez. Un archivo mal formado
+    produce ValueError.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        configs = json.loads(raw.decode("utf-8"))
+        profiles = [TemplateProfile(config) for config in configs]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Archivo de plantillas inválido {path}: {e}") from e
+    templates = TemplateSet(profiles, hashlib.sha256(raw).hexdigest()[:16])
+    _loaded[path] = (signature, templates)
+    return templates
@@ -0,0 +1,98 @@
+"""Lectura rápida de la capa de texto de la primera página.
+
+pdfplumber crea un objeto por carácter y analiza el diseño de la página con
+pdfminer, bastante más de lo necesario para encontrar unos pocos campos con
+etiqueta en facturas generadas por un ERP. Aquí se interpreta el flujo de
+contenido de la primera página con un dispositivo mínimo que arma las líneas
+de texto a partir de la posición de cada carácter, sin análisis de diseño.
+
+`extractor.extract_pdf_data` usa esta lectura como primer nivel y vuelve a
+pdfplumber cuando los datos obtenidos no pasan la validación.
+"""
+from collections import namedtuple
+
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from pdfminer.utils import decode_text
+
+# Tolerancias en puntos, las mismas que usa pdfplumber por defecto
+X_TOLERANCE = 3
+Y_TOLERANCE = 3
+
+# Texto de la primera página y metadato Producer del documento (None si no lo tiene)
+FirstPage = namedtuple("FirstPage", "text producer")
+
+
+class _LineCollector(PDFTextDevice):
+    """Dispositivo de pdfminer que junta el texto por líneas, sin objetos de diseño"""
+
+    def __init__(self, rsrcmgr):
+        super().__init__(rsrcmgr)
+        self.lines = []
+        self._line = []
+        self._y = None
+        self._x_end = None
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+        advance = font.char_width(cid) * fontsize * scaling
+        try:
+            char = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            char = ""
+        a, _, _, _, x, y = matrix
+        if self._y is None or abs(y - self._y) > Y_TOLERANCE:
+            self._end_line()
+            self._y = y
+        elif x - self._x_end > X_TOLERANCE and self._line and self._line[-1] != " ":
+            self._line.append(" ")
+        self._line.append(char)
+        self._x_end = x + advance * a
+        return advance
+
+    def _end_line(self):
+        if self._line:
+            self.lines.append("".join(self._line).strip())
+            self._line = []
+
+    def text(self):
+        self._end_line()
+        return "\n".join(self.lines)
+
+
+def document_producer(document):
+    """Metadato Producer de un PDFDocument de pdfminer, como texto"""
+    for info in document.info:
+        producer = resolve1(info.get("Producer"))
+        if isinstance(producer, bytes):
+            return decode_text(producer)
+        if isinstance(producer, str):
+            return producer
+    return None
+
+
+def read_first_page(pdf_path, stats=None):
+    """Lee la primera página; el texto queda una línea por renglón, en el orden del flujo de contenido.
+
+    Si se pasa el diccionario `stats`, se anotan en él las páginas leídas,
+    las totales y el productor del PDF.
+    """
+    with open(pdf_path, "rb") as f:
+        document = PDFDocument(PDFParser(f))
+        producer = document_producer(document)
+        page = next(PDFPage.create_pages(document), None)
+        if page is None:
+            return FirstPage("", producer)
+        # Un administrador de recursos por documento: las fuentes se guardan por número de objeto
+        rsrcmgr = PDFResourceManager()
+        device = _LineCollector(rsrcmgr)
+        PDFPageInterpreter(rsrcmgr, device).process_page(page)
+        if stats is not None:
+            stats["paginas"] = 1
+            stats["paginas_total"] = resolve1(document.catalog["Pages"]).get("Count")
+            stats["productor"] = producer
+    return FirstPage(device.text(), producer)
@@ -0,0 +1,172 @@
+"""Modo de vigilancia: procesa los PDFs que van llegando a una carpeta.
+
+Los archivos se consideran listos cuando su tamaño y fecha de modificación
+no cambian durante `debounce` segundos, para no leer PDFs a medio copiar.
+Los que ya se procesaron quedan anotados en un registro (una línea JSON por
+archivo) dentro de la carpeta, de modo que al reiniciar no se vuelven a leer.
+
+Si está instalado `watchdog` se usan las notificaciones del sistema
+(inotify en Linux) para reaccionar de inmediato; si no, la carpeta se
+revisa periódicamente.
+"""
+import json
+import os
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog es opcional
+    FileSystemEventHandler = object
+    Observer = None
+
+LEDGER_NAME = ".lector_procesados.jsonl"
+
+# Con notificaciones del sistema, igual se revisa la carpeta cada tanto por si se perdió alguna
+RESCAN_INTERVAL = 30.0
+
+
+def file_signature(path):
+    """Tamaño y fecha de modificación, para detectar archivos nuevos o modificados"""
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class ProcessedLedger:
+    """Registro persistente de los archivos ya procesados"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Línea incompleta por un corte anterior
+                    self._entries[entry["archivo"]] = (entry["tamaño"], entry["mtime_ns"])
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_processed(self, pdf_path, signature):
+        return self._entries.get(pdf_path) == signature
+
+    def add(self, pdf_path, signature, result):
+        self._entries[pdf_path] = signature
+        self._file.write(json.dumps({"archivo": pdf_path, "tamaño": signature[0],
+                                     "mtime_ns": signature[1], "resultado": result},
+                                    ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _WakeUpHandler(FileSystemEventHandler):
+    def __init__(self, event):
+        super().__init__()
+        self.event = event
+
+    def on_any_event(self, event):
+        self.event.set()
+
+
+class FolderWatcher:
+    """Detecta los PDFs nuevos de una carpeta que ya terminaron de escribirse"""
+
+    def __init__(self, directory, ledger, debounce=2.0, poll_interval=1.0):
+        self.directory = directory
+        self.ledger = ledger
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._seen = {}  # ruta -> (firma, momento en que se vio esa firma por primera vez)
+        self._wakeup = threading.Event()
+        self._observer = None
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_WakeUpHandler(self._wakeup), directory, recursive=False)
+            self._observer.start()
+
+    def ready_files(self):
+        """Devuelve [(ruta, firma)] de los PDFs nuevos que dejaron de cambiar"""
+        now = time.monotonic()
+        ready = []
+        present = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".pdf") or not entry.is_file():
+                    continue
+                try:
+                    signature = file_signature(entry.path)
+                except OSError:
+                    continue  # Se borró o movió mientras se revisaba
+                present.add(entry.path)
+                if self.ledger.is_processed(entry.path, signature):
+                    self._seen.pop(entry.path, None)
+                    continue
+                previous = self._seen.get(entry.path)
+                if previous is None or previous[0] != signature:
+                    self._seen[entry.path] = (signature, now)
+                elif now - previous[1] >= self.debounce:
+                    ready.append((entry.path, signature))
+        for pdf_path in list(self._seen):
+            if pdf_path not in present:
+                del self._seen[pdf_path]
+        return sorted(ready)
+
+    def wait(self):
+        """Espera hasta la próxima revisión de la carpeta"""
+        if self._seen:
+            timeout = min(self.poll_interval, self.debounce)  # Hay archivos por asentarse
+        elif self._observer is not None:
+            timeout = RESCAN_INTERVAL
+        else:
+            timeout = self.poll_interval
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def close(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+
+def watch_folder(processor, directory, workers=1, batch_size=20, debounce=2.0,
+                 poll_interval=1.0, ledger_path=None, stop_event=None,
+                 merge_interval=60.0, merge_rows=500):
+    """Vigila `directory` y entrega (ruta, resultado) de cada PDF procesado.
+
+    Los archivos listos se procesan en lotes de `batch_size` con el mismo
+    `processor`, de modo que el índice de RUT sigue en memoria entre lotes.
+    Cada lote se deja a salvo en disco (`processor.checkpoint`) antes de
+    anotarlo en el registro; el Excel, que se reescribe entero al guardarlo,
+    solo se actualiza cada `merge_interval` segundos o `merge_rows` clientes
+    nuevos, y al cerrar el `processor` al terminar.
+    Termina al activarse `stop_event` o al dejar de iterar.
+    """
+    ledger = ProcessedLedger(ledger_path or os.path.join(directory, LEDGER_NAME))
+    watcher = FolderWatcher(directory, ledger, debounce=debounce, poll_interval=poll_interval)
+    unmerged = 0
+    last_merge = time.monotonic()
+    try:
+        while stop_event is None or not stop_event.is_set():
+            ready = watcher.ready_files()
+            for start in range(0, len(ready), batch_size):
+                batch = dict(ready[start:start + batch_size])
+                results = list(processor.process_files(list(batch), workers=workers))
+                processor.checkpoint()
+                unmerged += sum(result == "success" for _, result in results)
+                for pdf_path, result in results:
+                    ledger.add(pdf_path, batch[pdf_path], result)
+                    yield pdf_path, result
+            if unmerged and (unmerged >= merge_rows
+                             or time.monotonic() - last_merge >= merge_interval):
+                processor.flush()
+                unmerged = 0
+                last_merge = time.monotonic()
+            if not ready:
+                watcher.wait()
+    finally:
+        watcher.close()
+        ledger.close()